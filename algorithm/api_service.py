@@ -1,13 +1,135 @@
 import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
 from config import get_algorithm_config
 import requests
+from requests.adapters import HTTPAdapter
 import json
-import uuid
-from models import LocationBase
+from models import RESOURCE_FIELDS
+from records import LocationRecord
+from catalog import LocationCatalog
+from events import EventLog
+from metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Recent requests per endpoint whose latencies set its timeout and hedge delay.
+LATENCY_WINDOW = 512
+# Requests an endpoint needs before its timeout and hedge delay adapt.
+LATENCY_MIN_SAMPLES = 20
+# Shortest adaptive timeout, in seconds.
+MIN_ADAPTIVE_TIMEOUT = 0.05
+# Largest share of hedgeable requests that may send a hedge.
+HEDGE_BUDGET = 0.1
+# Seconds a request waits between checks while another request trials an open circuit.
+CIRCUIT_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class APIResult:
+    """Outcome of a request: whether the API answered 200, and the JSON body it sent, if any."""
+    ok: bool
+    body: Any = None
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after repeated failures until a cool-down has passed.
+
+    After the cool-down a single trial request is let through; its outcome closes the
+    circuit again or re-opens it for another cool-down. Requests arriving while the
+    circuit is open wait for it, up to a deadline, rather than being dropped at once.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent."""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until a request may be sent, or until the timeout passes.
+
+        Args:
+            timeout (float): Longest wait, in seconds.
+
+        Returns:
+            bool: True if a request may be sent, False if the timeout passed first.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.allow():
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return False
+            with self._lock:
+                remaining = 0.0 if self._opened_at is None else self.reset_timeout - (time.monotonic() - self._opened_at)
+            time.sleep(min(max(remaining, CIRCUIT_POLL_INTERVAL), left))
+        return True
+
+    def record_success(self):
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure and open the circuit once the threshold is reached."""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.error(f"Circuit opened after {self._failures} consecutive failures.")
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Latencies of the most recent requests to one endpoint."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._sorted: list[float] | None = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._sorted = None
+
+    def quantile(self, q: float) -> float | None:
+        """The q-th quantile of the recent latencies, or None until there are enough of them."""
+        with self._lock:
+            if len(self._samples) < LATENCY_MIN_SAMPLES:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._samples)
+            return self._sorted[min(math.ceil(q * len(self._sorted)) - 1, len(self._sorted) - 1)]
+
 
 class APIService:
     """
@@ -16,82 +138,244 @@ class APIService:
 
     def __init__(self):
         self.algorithm_config = get_algorithm_config()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.algorithm_config.http_pool_size,
+            pool_maxsize=self.algorithm_config.http_pool_size,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.circuit_breaker = CircuitBreaker(
+            self.algorithm_config.circuit_breaker_threshold,
+            self.algorithm_config.circuit_breaker_reset,
+        )
+        self._control_breaker = CircuitBreaker(0, 0.0)
+        self.events = EventLog(
+            self.algorithm_config.event_log_path or None,
+            self.algorithm_config.event_log_max_bytes,
+            self.algorithm_config.event_log_queue_size,
+        )
+        self._latencies: dict[tuple, LatencyTracker] = {}
+        self._latencies_lock = threading.Lock()
+        self._hedge_pool: ThreadPoolExecutor | None = None
+        self._hedgeable = self._hedged = 0
+        self._hedge_lock = threading.Lock()
 
-    def _send_post_request_with_retry(self, url: str, params: dict, body: dict):
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given zero-based attempt."""
+        cap = min(self.algorithm_config.retry_backoff_max, self.algorithm_config.retry_backoff_base * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    def _endpoint(self, url: str) -> dict:
+        """Metric labels for a URL, with the service segment of a path pulled out."""
+        parts = url[len(self.algorithm_config.api_host):].strip("/").split("/")
+        if len(parts) == 2 and parts[0] in RESOURCE_FIELDS:
+            return {"endpoint": f"/{{service}}/{parts[1]}", "service": parts[0]}
+        return {"endpoint": "/" + "/".join(parts)}
+
+    def _latency_tracker(self, labels: dict) -> LatencyTracker:
+        key = tuple(sorted(labels.items()))
+        tracker = self._latencies.get(key)
+        if tracker is None:
+            with self._latencies_lock:
+                tracker = self._latencies.setdefault(key, LatencyTracker())
+        return tracker
+
+    def _timeout_for(self, tracker: LatencyTracker) -> float:
+        """A multiple of the endpoint's p99 latency, capped by the configured timeout."""
+        ceiling = self.algorithm_config.timeout
+        multiplier = self.algorithm_config.adaptive_timeout_multiplier
+        p99 = tracker.quantile(0.99) if multiplier > 0 else None
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(MIN_ADAPTIVE_TIMEOUT, multiplier * p99))
+
+    def _allow_hedge(self) -> bool:
+        with self._hedge_lock:
+            if self._hedged < HEDGE_BUDGET * self._hedgeable:
+                self._hedged += 1
+                return True
+            return False
+
+    def _hedged_get(self, url: str, params: dict | None, timeout: float, tracker: LatencyTracker, labels: dict) -> requests.Response:
         """
-        Send a POST request with retry logic.
+        Send a GET and, if it is still pending after the endpoint's hedge quantile, a duplicate.
+
+        The first response to arrive wins; the other request is left to finish in
+        the background. Hedges are limited to HEDGE_BUDGET of the hedgeable requests
+        so a slow API does not see its load doubled.
+
+        Args:
+            url (str): The request URL.
+            params (dict | None): Query parameters.
+            timeout (float): Timeout of each request.
+            tracker (LatencyTracker): Latencies of the endpoint.
+            labels (dict): Metric labels of the endpoint.
+
+        Returns:
+            requests.Response: The first response.
+        """
+        quantile = self.algorithm_config.hedge_quantile
+        delay = tracker.quantile(quantile) if quantile > 0 else None
+        if delay is None or delay >= timeout:
+            return self.session.request("GET", url, params=params, timeout=timeout)
+
+        with self._hedge_lock:
+            self._hedgeable += 1
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=max(self.algorithm_config.http_pool_size, 1) * 2, thread_name_prefix="hedge"
+                )
+        primary = self._hedge_pool.submit(self.session.request, "GET", url, params=params, timeout=timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._allow_hedge():
+            return primary.result()
+
+        metrics = get_metrics()
+        metrics.counter("api_hedges_total", "Hedged duplicate requests sent.", **labels).inc()
+        hedge = self._hedge_pool.submit(self.session.request, "GET", url, params=params, timeout=timeout)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        metrics.counter("api_hedge_wins_total", "Hedged requests answered before the original.", **labels).inc()
+                    return future.result()
+            if not pending:
+                return primary.result()
+
+    def close(self):
+        """Stop the hedge threads and close the HTTP session; the service cannot send requests afterwards."""
+        with self._hedge_lock:
+            pool, self._hedge_pool = self._hedge_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self.session.close()
+
+    def _send_request_with_retry(self, method: str, url: str, params: dict = None, body: dict = None):
+        """
+        Send a request with retry, backoff and circuit breaker logic.
+
+        Idempotent GETs, which excludes /calls/next since every read issues a new
+        call, get a timeout adapted to the endpoint's recent latencies and may be
+        hedged. Other requests use the configured timeout, so a slow dispatch is
+        not retried and applied twice.
 
         Args:
+            method (str): HTTP method.
             url (str): The request URL.
             params (dict): Query parameters.
             body (dict): JSON body payload.
 
         Returns:
-            dict or None: Parsed response or None if failed.
+            APIResult: Success once the API answered 200, even with an empty or
+            non-JSON body; failure on HTTP errors, exceptions or running out of retries.
         """
         retry = self.algorithm_config.retry_count
-        timeout = self.algorithm_config.timeout
+        metrics = get_metrics()
+        labels = self._endpoint(url)
+        latency = metrics.histogram("api_request_seconds", "Latency of API request attempts.", **labels)
+        tracker = self._latency_tracker(labels)
+        idempotent = method == "GET" and labels["endpoint"] != "/calls/next"
+        # Simulation control must go through even while the API is failing, and its
+        # outcome says nothing about the health of the dispatch endpoints.
+        breaker = self._control_breaker if labels["endpoint"].startswith("/control/") else self.circuit_breaker
+
+        def outcome(name: str):
+            metrics.counter("api_requests_total", "API request attempts by outcome.", outcome=name, **labels).inc()
 
+        # With the API down, threads take turns sending trial requests; past this
+        # deadline the request fails instead of queueing for every other thread's turn.
+        circuit_deadline = time.monotonic() + retry * breaker.reset_timeout
         for attempt in range(retry):
+            if attempt > 0:
+                metrics.counter("api_retries_total", "API request retries.", **labels).inc()
+                time.sleep(self._backoff(attempt - 1))
+            if not breaker.allow():
+                outcome("circuit_open")
+                logger.warning(f"Circuit open, waiting to send {method} request to {url}.")
+                if not breaker.wait(circuit_deadline - time.monotonic()):
+                    logger.error(f"Circuit still open, giving up on {method} request to {url}.")
+                    break
+            started = time.perf_counter()
             try:
-                response = requests.post(url, params=params, timeout=timeout, json=body)
+                if idempotent:
+                    response = self._hedged_get(url, params, self._timeout_for(tracker), tracker, labels)
+                else:
+                    response = self.session.request(method, url, params=params, timeout=self.algorithm_config.timeout, json=body)
+                elapsed = time.perf_counter() - started
+                latency.observe(elapsed)
+                tracker.observe(elapsed)
                 if response.status_code == 200:
-                    if response.text.strip():
+                    breaker.record_success()
+                    # The body is decoded straight from bytes; json.loads detects the encoding.
+                    content = response.content
+                    if content and not content.isspace():
                         try:
-                            return json.loads(response.text)
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug(f"Response 200: {response.text}")
+                            result = json.loads(content)
+                            outcome("ok")
+                            return APIResult(True, result)
                         except json.JSONDecodeError:
+                            outcome("invalid_json")
                             logger.warning("Response returned 200 but contains invalid JSON.")
-                            return None
+                            return APIResult(True)
                     else:
+                        outcome("empty")
                         logger.warning("Response returned 200 but is empty.")
-                        return None
+                        return APIResult(True)
                 else:
+                    outcome(f"http_{response.status_code}")
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
                     logger.warning(f"Attempt {attempt + 1}/{retry} failed with status code {response.status_code}")
             except requests.exceptions.Timeout:
+                elapsed = time.perf_counter() - started
+                latency.observe(elapsed)
+                tracker.observe(elapsed)
+                outcome("timeout")
+                breaker.record_failure()
                 logger.warning(f"Attempt {attempt + 1}/{retry} timed out.")
             except requests.exceptions.RequestException as e:
+                latency.observe(time.perf_counter() - started)
+                outcome("error")
+                breaker.record_failure()
                 logger.warning(f"Attempt {attempt + 1}/{retry} failed due to an error: {e}")
 
-        logger.error(f"POST request to {url} failed after {retry} attempts.")
-        return None
+        metrics.counter("api_failures_total", "API requests that failed after every retry.", **labels).inc()
+        logger.error(f"{method} request to {url} failed after {retry} attempts.")
+        return APIResult(False)
 
-    def _send_get_request_with_retry(self, url: str, params: dict = None):
+    def _send_post_request_with_retry(self, url: str, params: dict, body: dict):
         """
-        Send a GET request with retry logic.
+        Send a POST request with retry logic.
 
         Args:
             url (str): The request URL.
             params (dict): Query parameters.
+            body (dict): JSON body payload.
 
         Returns:
             dict or None: Parsed response or None if failed.
         """
-        retry = self.algorithm_config.retry_count
-        timeout = self.algorithm_config.timeout
+        return self._send_request_with_retry("POST", url, params, body).body
 
-        for attempt in range(retry):
-            try:
-                response = requests.get(url, params=params, timeout=timeout)
-                if response.status_code == 200:
-                    if response.text.strip():
-                        try:
-                            logger.debug(f"Response 200: {response.text}")
-                            return json.loads(response.text)
-                        except json.JSONDecodeError:
-                            logger.warning("Response returned 200 but contains invalid JSON.")
-                            return None
-                    else:
-                        logger.warning("Response returned 200 but is empty.")
-                        return None
-                else:
-                    logger.warning(f"Attempt {attempt + 1}/{retry} failed with status code {response.status_code}")
-            except requests.exceptions.Timeout:
-                logger.warning(f"Attempt {attempt + 1}/{retry} timed out.")
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Attempt {attempt + 1}/{retry} failed due to an error: {e}")
+    def _send_get_request_with_retry(self, url: str, params: dict = None):
+        """
+        Send a GET request with retry logic.
 
-        logger.error(f"GET request to {url} failed after {retry} attempts.")
-        return None
+        Args:
+            url (str): The request URL.
+            params (dict): Query parameters.
+
+        Returns:
+            dict or None: Parsed response or None if failed.
+        """
+        return self._send_request_with_retry("GET", url, params).body
 
     def start_simulation(self):
         """Initialize a new simulation run."""
@@ -101,45 +385,33 @@ class APIService:
             "targetDispatches": self.algorithm_config.target_dispatches,
             "maxActiveCalls": self.algorithm_config.max_active_calls,
         }
+        self.events.record("start", api_host=self.algorithm_config.api_host, **params)
         self._send_post_request_with_retry(url, params, None)
 
     def stop_simulation(self):
         """Stop the simulation run."""
         url = f"{self.algorithm_config.api_host}/control/stop"
-        return self._send_post_request_with_retry(url, None, None)
+        response = self._send_post_request_with_retry(url, None, None)
+        self.events.record("stop", response=response)
+        return response
 
     def next(self):
         """Get the next emergency call."""
         url = f"{self.algorithm_config.api_host}/calls/next"
-        return self._send_get_request_with_retry(url)
-
-    def location_exists(self, city: str, county: str, locations: list[LocationBase]) -> int:
-        """
-        Check if a location exists in the list.
-
-        Args:
-            city (str): City name.
-            county (str): County name.
-            locations (list[LocationBase]): List of locations.
-
-        Returns:
-            int: Index of location if exists, otherwise -1.
-        """
-        for index, location in enumerate(locations):
-            if location.city == city and location.county == county:
-                return index
-        return -1
+        response = self._send_get_request_with_retry(url)
+        if response is not None:
+            self.events.record("emergency", payload=response)
+        return response
 
-    def get_locations(self) -> list[LocationBase]:
+    def get_locations(self) -> LocationCatalog:
         """
         Fetch all locations with any available emergency services.
 
         Returns:
-            list[LocationBase]: Unique locations.
+            LocationCatalog: Unique locations keyed by city and county.
         """
-        services = ["medical", "fire", "police", "rescue", "utility"]
-        locations = []
-        for service in services:
+        catalog = LocationCatalog()
+        for service in RESOURCE_FIELDS:
             url = f"{self.algorithm_config.api_host}/{service}/search"
             response = self._send_get_request_with_retry(url, {})
             if response is None:
@@ -147,18 +419,18 @@ class APIService:
                 continue
 
             for location in response:
-                if self.location_exists(location["city"], location["county"], locations) == -1:
-                    locations.append(LocationBase(
-                        location_id=uuid.uuid4(),
-                        county=location["county"],
-                        city=location["city"],
-                        latitude=location["latitude"],
-                        longitude=location["longitude"],
-                    ))
+                if (location["city"], location["county"]) in catalog:
+                    continue
+                catalog.add(LocationRecord(
+                    location["city"],
+                    location["county"],
+                    float(location["latitude"]),
+                    float(location["longitude"]),
+                ))
 
-        return locations
+        return catalog
 
-    def get_service_for_city(self, service_name: str, city: str, county: str) -> int:
+    def get_service_for_city(self, service_name: str, city: str, county: str) -> int | None:
         """
         Get quantity of a specific service type available in a city.
 
@@ -168,14 +440,16 @@ class APIService:
             county (str): County name.
 
         Returns:
-            int: Quantity of service available.
+            int | None: Quantity of service available, or None if the read failed after every retry.
         """
         url = f"{self.algorithm_config.api_host}/{service_name}/searchbycity"
         params = {"city": city, "county": county}
         response = self._send_get_request_with_retry(url, params)
         if response is None:
-            return 0
-        return max(response, 0)
+            return None
+        quantity = max(response, 0)
+        self.events.record("availability", service=service_name, city=city, county=county, quantity=quantity)
+        return quantity
 
     def dispatch_service_to_city(
         self, service_name: str, source_city: str, source_county: str, target_city: str, target_county: str, quantity: int
@@ -192,7 +466,7 @@ class APIService:
             quantity (int): Quantity to dispatch.
 
         Returns:
-            dict or None: Response from the dispatch API.
+            bool: True if the API accepted the dispatch, whatever its response body.
         """
         url = f"{self.algorithm_config.api_host}/{service_name}/dispatch"
         body = {
@@ -202,4 +476,6 @@ class APIService:
             "targetCounty": target_county,
             "quantity": quantity
         }
-        return self._send_post_request_with_retry(url, None, body)
\ No newline at end of file
+        result = self._send_request_with_retry("POST", url, None, body)
+        self.events.record("dispatch", service=service_name, **body, response=result.body, confirmed=result.ok)
+        return result.ok
\ No newline at end of file
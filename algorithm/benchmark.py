@@ -0,0 +1,273 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+BENCHMARK_API_HOST = "http://simulator.local"
+
+# Each scenario sets the simulator map and call stream plus any ALGORITHM_* overrides.
+SCENARIOS = {
+    "small": {
+        "simulator": {"locations": 100, "counties": 4},
+        "algorithm": {"target_dispatches": 200, "max_active_calls": 20},
+    },
+    "large-map": {
+        "simulator": {"locations": 2000, "counties": 16},
+        "algorithm": {"target_dispatches": 500, "max_active_calls": 50},
+    },
+    "many-calls": {
+        "simulator": {"locations": 300, "counties": 8, "max_stock": 20},
+        "algorithm": {"target_dispatches": 2000, "max_active_calls": 100},
+    },
+    "fire-heavy": {
+        "simulator": {"locations": 300, "counties": 8, "resource_weights": {"fire": 6, "medical": 1, "police": 1}},
+        "algorithm": {"target_dispatches": 500, "max_active_calls": 50},
+    },
+    "sparse-stock": {
+        "simulator": {"locations": 500, "counties": 8, "stock_probability": 0.1},
+        "algorithm": {"target_dispatches": 300, "max_active_calls": 30},
+    },
+    "latency": {
+        "simulator": {"locations": 100, "counties": 4, "latency_ms": 2.0, "latency_jitter_ms": 3.0},
+        "algorithm": {"target_dispatches": 200, "max_active_calls": 20},
+    },
+    "tail-latency": {
+        "simulator": {"locations": 300, "counties": 8, "latency_ms": 1.0, "slow_probability": 0.03, "slow_ms": 100.0},
+        "algorithm": {"target_dispatches": 200, "max_active_calls": 20, "warmup_workers": 4},
+    },
+}
+
+
+@contextmanager
+def _configured(algorithm: dict):
+    """
+    Point the engine configuration at the in-process simulator for one run.
+
+    The environment is restored afterwards and the metrics registry is replaced on
+    the way in and out, so no override or counter leaks into the next run.
+    """
+    from config import get_algorithm_config
+    from metrics import get_metrics
+
+    saved = dict(os.environ)
+    os.environ["ALGORITHM_API_HOST"] = BENCHMARK_API_HOST
+    os.environ.setdefault("ALGORITHM_SEED", "benchmark")
+    os.environ.setdefault("ALGORITHM_RETRY_COUNT", "3")
+    os.environ.setdefault("ALGORITHM_TIMEOUT", "5.0")
+    for key, value in algorithm.items():
+        os.environ[f"ALGORITHM_{key.upper()}"] = str(value)
+    get_algorithm_config.cache_clear()
+    get_metrics.cache_clear()
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+        get_algorithm_config.cache_clear()
+        get_metrics.cache_clear()
+
+
+def run_scenario(name: str, scenario: dict) -> dict:
+    """
+    Run AlgorithmEngine once against an in-process simulator.
+
+    Args:
+        name (str): Scenario name.
+        scenario (dict): Simulator settings and ALGORITHM_* overrides.
+
+    Returns:
+        dict: Throughput, latency, request and cost figures of the run.
+    """
+    import simulator
+    from main import AlgorithmEngine
+
+    with _configured(scenario.get("algorithm", {})):
+        engine = AlgorithmEngine()
+        sim = simulator.install(engine.api_service, simulator.EmergencySimulator(
+            simulator.SimulatorConfig(**scenario.get("simulator", {}))
+        ))
+        started = time.perf_counter()
+        engine.run()
+        elapsed = time.perf_counter() - started
+
+    calls = max(sim.issued, 1)
+    latencies = np.array(sim.call_latencies) * 1000 if sim.call_latencies else np.zeros(1)
+    return {
+        "scenario": name,
+        "calls": sim.issued,
+        "seconds": round(elapsed, 4),
+        "emergencies_per_sec": round(sim.issued / elapsed, 2),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+            "p99": round(float(np.percentile(latencies, 99)), 3),
+        },
+        "requests_per_emergency": round(sim.requests / calls, 3),
+        "dispatch_cost": round(sim.distance, 4),
+        "completion_rate": round(sim.completed / calls, 4),
+    }
+
+
+def _validated_emergency(payload: dict):
+    """Parse a raw emergency payload into the validated EmergencyLocation model."""
+    from models import EmergencyLocation, RESOURCE_FIELDS, SERVICE_TYPES
+
+    needs = {field: 0 for field in RESOURCE_FIELDS}
+    for req in payload.get("requests", []):
+        field = SERVICE_TYPES.get(req.get("Type"))
+        if field:
+            needs[field] = req.get("Quantity", 0)
+    return EmergencyLocation(
+        county=payload.get("county", ""),
+        city=payload.get("city", ""),
+        latitude=payload.get("latitude", 0.0),
+        longitude=payload.get("longitude", 0.0),
+        **needs,
+    )
+
+
+def bench_decode(calls: int = 20_000, window: int = 50, repeat: int = 5) -> dict:
+    """
+    Micro-benchmark of decoding /calls/next bodies into emergencies.
+
+    Compares the validated path (text copy, JSON from text, EmergencyLocation model)
+    with decoding the bytes into EmergencyRecord one by one and as a batch.
+
+    Args:
+        calls (int): Call bodies decoded per run.
+        window (int): Calls per batch, as a prefetching pipeline would hand them over.
+        repeat (int): Runs per path; the fastest is reported.
+
+    Returns:
+        dict: Microseconds per call for each path and the speedups over the validated path.
+    """
+    import simulator
+    from records import EmergencyRecord
+
+    with _configured({"target_dispatches": calls, "max_active_calls": 1}):
+        sim = simulator.EmergencySimulator(simulator.SimulatorConfig())
+        bodies = [json.dumps(sim._generate_call()).encode() for _ in range(calls)]
+
+    def validated():
+        for body in bodies:
+            text = body.decode()
+            if text.strip():
+                _validated_emergency(json.loads(text))
+
+    def records():
+        for body in bodies:
+            EmergencyRecord.from_payload(json.loads(body))
+
+    def batch():
+        for start in range(0, calls, window):
+            EmergencyRecord.from_payloads([json.loads(body) for body in bodies[start:start + window]])
+
+    per_call = {}
+    for name, path in (("validated", validated), ("record", records), ("record_batch", batch)):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            path()
+            timings.append(time.perf_counter() - started)
+        per_call[name] = min(timings) / calls * 1e6
+
+    return {
+        "benchmark": "decode",
+        "calls": calls,
+        "window": window,
+        "us_per_call": {name: round(value, 3) for name, value in per_call.items()},
+        "speedup": {
+            name: round(per_call["validated"] / value, 2) for name, value in per_call.items() if name != "validated"
+        },
+    }
+
+
+MICRO_BENCHMARKS = {
+    "decode": bench_decode,
+}
+
+
+def compare(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    """
+    Find scenarios whose throughput dropped by more than the allowed fraction.
+
+    Args:
+        results (list[dict]): Current results.
+        baseline (list[dict]): Results of a previous run.
+        max_regression (float): Allowed relative drop, e.g. 0.1 for 10%.
+
+    Returns:
+        list[str]: A message per regressed scenario.
+    """
+    previous = {result["scenario"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        floor = before["emergencies_per_sec"] * (1 - max_regression)
+        if result["emergencies_per_sec"] < floor:
+            regressions.append(
+                f"{result['scenario']}: {result['emergencies_per_sec']} emergencies/sec, "
+                f"baseline {before['emergencies_per_sec']}"
+            )
+    return regressions
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AlgorithmEngine against the local simulator.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run, repeatable. Defaults to all.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest run is reported.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", type=Path, help="JSON report of a previous run to compare throughput against.")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="Allowed throughput drop against the baseline.")
+    parser.add_argument("--micro", choices=sorted(MICRO_BENCHMARKS), help="Run a micro-benchmark instead of the scenarios.")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.micro:
+        text = json.dumps(MICRO_BENCHMARKS[args.micro](), indent=2)
+        if args.output:
+            args.output.write_text(text)
+        print(text)
+        return 0
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        runs = [run_scenario(name, SCENARIOS[name]) for _ in range(max(args.repeat, 1))]
+        results.append(max(runs, key=lambda run: run["emergencies_per_sec"]))
+
+    report = {"revision": _git_revision(), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    print(text)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.max_regression)
+        for regression in regressions:
+            print(f"Throughput regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
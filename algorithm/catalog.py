@@ -0,0 +1,104 @@
+import uuid
+from array import array
+from collections.abc import Iterator
+import numpy as np
+from records import LocationRecord
+
+LOCATION_NAMESPACE = uuid.UUID("6f1c3a52-8a47-4b8e-9d59-2a8e5c0f7b31")
+
+
+def location_id_for(city: str, county: str) -> uuid.UUID:
+    """
+    Build a stable identifier for a location.
+
+    Args:
+        city (str): City name.
+        county (str): County name.
+
+    Returns:
+        uuid.UUID: The same UUID for the same city and county on every run.
+    """
+    return uuid.uuid5(LOCATION_NAMESPACE, f"{county}/{city}")
+
+
+class LocationCatalog:
+    """
+    Hash-indexed collection of locations keyed by (city, county).
+
+    Iteration follows insertion order, so the catalog can stand in anywhere a list
+    of locations was used before. Coordinates are also kept as two packed columns
+    in the same order, so vectorized distance code reads them without touching the
+    records.
+    """
+
+    def __init__(self, locations: list[LocationRecord] | None = None):
+        self._locations: dict[tuple[str, str], LocationRecord] = {}
+        self._ids: dict[tuple[str, str], uuid.UUID] = {}
+        self._latitude = array("d")
+        self._longitude = array("d")
+        self._coordinates: tuple[np.ndarray, np.ndarray] | None = None
+        for location in locations or []:
+            self.add(location)
+
+    def add(self, location: LocationRecord) -> LocationRecord:
+        """
+        Add a location unless one with the same city and county is already known.
+
+        Args:
+            location (LocationRecord): Location to add.
+
+        Returns:
+            LocationRecord: The catalog entry for the location.
+        """
+        key = (location.city, location.county)
+        existing = self._locations.get(key)
+        if existing is not None:
+            return existing
+        self._locations[key] = location
+        self._ids[key] = location_id_for(location.city, location.county)
+        self._latitude.append(location.latitude)
+        self._longitude.append(location.longitude)
+        self._coordinates = None
+        return location
+
+    def merge(self, locations: list[LocationRecord]) -> int:
+        """
+        Add several locations, skipping duplicates.
+
+        Args:
+            locations (list[LocationRecord]): Locations to add.
+
+        Returns:
+            int: Number of new locations.
+        """
+        before = len(self._locations)
+        for location in locations:
+            self.add(location)
+        return len(self._locations) - before
+
+    def get(self, city: str, county: str) -> LocationRecord | None:
+        """Get a location by city and county."""
+        return self._locations.get((city, county))
+
+    def location_id(self, city: str, county: str) -> uuid.UUID | None:
+        """Get the stable identifier of a location."""
+        return self._ids.get((city, county))
+
+    def coordinates(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the latitude and longitude columns in insertion order."""
+        if self._coordinates is None:
+            self._coordinates = (np.array(self._latitude), np.array(self._longitude))
+        return self._coordinates
+
+    def keys(self) -> list[tuple[str, str]]:
+        """Get the (city, county) keys in insertion order."""
+        return list(self._locations)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._locations
+
+    def __iter__(self) -> Iterator[LocationRecord]:
+        return iter(self._locations.values())
+
+    def __len__(self) -> int:
+        return len(self._locations)
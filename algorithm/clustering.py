@@ -0,0 +1,113 @@
+import logging
+import zlib
+import numpy as np
+from catalog import LocationCatalog
+from distance import project_coordinates
+from records import LocationRecord
+
+logger = logging.getLogger(__name__)
+
+KMEANS_MAX_ITERATIONS = 50
+
+
+def kmeans(points: np.ndarray, k: int, seed: str, max_iterations: int = KMEANS_MAX_ITERATIONS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lloyd's k-means with k-means++ seeding, deterministic for a given seed.
+
+    Args:
+        points (np.ndarray): Points of shape (n, d).
+        k (int): Number of clusters, at most n.
+        seed (str): Seed of the initial centroids.
+        max_iterations (int): Iterations before giving up on convergence.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Centroids of shape (k, d) and the cluster of every point.
+    """
+    rng = np.random.default_rng(zlib.crc32(seed.encode()))
+    centroids = [points[rng.integers(len(points))]]
+    closest = np.sum((points - centroids[0]) ** 2, axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        chosen = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+        centroids.append(points[chosen])
+        closest = np.minimum(closest, np.sum((points - points[chosen]) ** 2, axis=1))
+    centroids = np.array(centroids, dtype=float)
+
+    # Squared distances expand to |x|^2 - 2 x.c + |c|^2: one (n, k) matrix product per
+    # iteration instead of an (n, k, d) difference array. |x|^2 does not change the
+    # nearest centroid, so it is left out.
+    labels = np.zeros(len(points), dtype=np.int64)
+    for iteration in range(max_iterations):
+        squared = np.sum(centroids ** 2, axis=1) - 2.0 * (points @ centroids.T)
+        new_labels = np.argmin(squared, axis=1)
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        sums = np.column_stack([np.bincount(labels, weights=column, minlength=k) for column in points.T])
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids, labels
+
+
+class EpicenterClusters:
+    """
+    Epicenters found by k-means over the catalog, with the cluster of every location.
+
+    Clustering runs in the projected space of the distance metric, so haversine
+    clusters are formed on the unit sphere. Catalog locations map to their cluster
+    with one dictionary lookup; other locations go to the nearest centroid.
+    """
+
+    def __init__(self, locations: LocationCatalog, k: int, seed: str, metric: str = "euclidean"):
+        self.metric = metric
+        points = project_coordinates(*locations.coordinates(), metric)
+        self.k = max(min(k, len(points)), 1)
+        self.centroids, labels = kmeans(points, self.k, seed)
+        if metric == "haversine":
+            self.centroids /= np.linalg.norm(self.centroids, axis=1, keepdims=True)
+        self._labels = dict(zip(locations.keys(), labels.tolist()))
+        self.sizes = np.bincount(labels, minlength=self.k).tolist()
+        logger.info(f"Clustered {len(points)} locations around {self.k} epicenters, sizes {self.sizes}.")
+
+    def epicenters(self) -> list[LocationRecord]:
+        """Centroids as locations, in cluster order."""
+        if self.metric == "haversine":
+            lat = np.degrees(np.arcsin(np.clip(self.centroids[:, 2], -1.0, 1.0)))
+            lon = np.degrees(np.arctan2(self.centroids[:, 1], self.centroids[:, 0]))
+        else:
+            lat, lon = self.centroids[:, 0], self.centroids[:, 1]
+        return [
+            LocationRecord(f"Epicenter {cluster + 1}", "", float(lat[cluster]), float(lon[cluster]))
+            for cluster in range(self.k)
+        ]
+
+    def cluster_of(self, location: LocationRecord) -> int:
+        """
+        Find the cluster of a location.
+
+        Args:
+            location (LocationRecord): Any location.
+
+        Returns:
+            int: Its cluster, or the cluster of the nearest centroid if it is not in the catalog.
+        """
+        cluster = self._labels.get((location.city, location.county))
+        if cluster is None:
+            point = project_coordinates(location.latitude, location.longitude, self.metric)[0]
+            cluster = int(np.argmin(np.sum((self.centroids - point) ** 2, axis=1)))
+        return cluster
+
+    def order_suppliers(self, cluster: int, supplier_points: np.ndarray) -> np.ndarray:
+        """
+        Order suppliers by distance to the centroid of a cluster.
+
+        Args:
+            cluster (int): Cluster.
+            supplier_points (np.ndarray): Projected supplier coordinates.
+
+        Returns:
+            np.ndarray: Supplier positions, nearest first.
+        """
+        distances = np.sum((supplier_points - self.centroids[cluster]) ** 2, axis=1)
+        return np.argsort(distances, kind="stable")
@@ -1,6 +1,7 @@
 from collections.abc import Iterator
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import (
     BaseSettings,
@@ -14,6 +15,9 @@ from sqlmodel import (
 
 DEFAULT_DB_DIALECT = "postgresql"
 DEFAULT_DB_POOL_SIZE = 10
+DEFAULT_HTTP_POOL_SIZE = 20
+DEFAULT_EVENT_LOG_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_EVENT_LOG_QUEUE_SIZE = 10_000
 ROOT_DIR = Path(__file__).parent
 
 class AlgorithmConfig(BaseSettings):
@@ -24,6 +28,36 @@ class AlgorithmConfig(BaseSettings):
     max_active_calls: int
     retry_count: int
     timeout: float
+    inventory_reconcile_interval: int = 0
+    distance_metric: Literal["euclidean", "haversine"] = "euclidean"
+    distance_matrix_max_cells: int = 4_000_000
+    home_county: str = "Maramureș"
+    epicenter_clusters: int = 0
+    engine_mode: Literal["sequential", "concurrent", "sharded"] = "sequential"
+    shard_count: int = 0
+    http_pool_size: int = DEFAULT_HTTP_POOL_SIZE
+    retry_backoff_base: float = 0.1
+    retry_backoff_max: float = 2.0
+    circuit_breaker_threshold: int = 10
+    circuit_breaker_reset: float = 5.0
+    adaptive_timeout_multiplier: float = 4.0
+    hedge_quantile: float = 0.95
+    dispatch_workers: int = 8
+    dispatch_replan_attempts: int = 1
+    solver_strategy: Literal["greedy", "min_cost_flow"] = "greedy"
+    batch_window: int = 50
+    prefetch_depth: int = 0
+    supplier_order_cache_size: int = 1024
+    supplier_order_prefix: int = 256
+    metrics_port: int = 0
+    warmup_workers: int = 16
+    warmup_ready_fraction: float = 1.0
+    catalog_snapshot_dir: str = ""
+    catalog_snapshot_refresh: bool = False
+    event_log_path: str = ""
+    event_log_max_bytes: int = DEFAULT_EVENT_LOG_MAX_BYTES
+    event_log_queue_size: int = DEFAULT_EVENT_LOG_QUEUE_SIZE
+    metrics_summary_path: str = ""
 
     model_config = SettingsConfigDict(
         env_prefix= "ALGORITHM_",
@@ -74,10 +108,11 @@ def get_connection_string() -> str:
     )
 
 
+@lru_cache
 def get_database_engine() -> Engine:
-    """Get the database engine."""
+    """Get the process-wide database engine, so every caller shares one connection pool."""
     database_config = get_database_config()
-    return create_engine(get_connection_string(database_config), pool_size=database_config.pool_size)
+    return create_engine(get_connection_string(), pool_size=database_config.pool_size)
 
 
 def get_database_session() -> Iterator[Session]:
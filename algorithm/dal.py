@@ -1,5 +1,7 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import (
     NoResultFound,
 )
@@ -8,14 +10,19 @@ from sqlmodel import (
     select,
 )
 
+from catalog import LocationCatalog, location_id_for
 from exceptions import LocationNotFoundException
 from config import get_database_engine
+from records import LocationRecord
 
-from .models import (
+from models import (
     Location,
     LocationBase,
+    RESOURCE_FIELDS,
 )
 
+DEFAULT_BULK_CHUNK_SIZE = 1000
+
 
 class LocationsDataAccessLayer:
     def __init__(self) -> None:
@@ -61,4 +68,105 @@ class LocationsDataAccessLayer:
             session.add(location)
             session.commit()
             session.refresh(location)
-            return location
\ No newline at end of file
+            return location
+
+    def bulk_upsert_locations(
+        self,
+        locations: Iterable[LocationBase | LocationRecord],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Insert or update many locations with one multi-row statement per chunk.
+
+        Rows are keyed on (city, county) and get the stable ID of the catalog, so
+        re-ingesting the same map updates rows in place. Service quantities are
+        written only for locations that carry them; other locations are inserted
+        with 0 and leave the quantities of an existing row alone. When a key appears
+        more than once, the last location wins.
+
+        Args:
+            locations (Iterable[LocationBase | LocationRecord]): Locations to store.
+            chunk_size (int): Rows per statement.
+
+        Returns:
+            int: Number of rows written.
+        """
+        with_services: dict[tuple[str, str], dict] = {}
+        without_services: dict[tuple[str, str], dict] = {}
+        for location in locations:
+            key = (location.city, location.county)
+            row = {
+                "location_id": location_id_for(location.city, location.county),
+                "county": location.county,
+                "city": location.city,
+                "latitude": location.latitude,
+                "longitude": location.longitude,
+                **{field: getattr(location, field, 0) for field in RESOURCE_FIELDS},
+            }
+            if all(hasattr(location, field) for field in RESOURCE_FIELDS):
+                without_services.pop(key, None)
+                with_services[key] = row
+            else:
+                with_services.pop(key, None)
+                without_services[key] = row
+        if not with_services and not without_services:
+            return 0
+
+        with Session(self._engine) as session:
+            self._upsert_rows(session, list(with_services.values()), ["latitude", "longitude", *RESOURCE_FIELDS], chunk_size)
+            self._upsert_rows(session, list(without_services.values()), ["latitude", "longitude"], chunk_size)
+            session.commit()
+        return len(with_services) + len(without_services)
+
+    @staticmethod
+    def _upsert_rows(session: Session, rows: list[dict], columns: list[str], chunk_size: int):
+        for start in range(0, len(rows), chunk_size):
+            statement = insert(Location).values(rows[start:start + chunk_size])
+            statement = statement.on_conflict_do_update(
+                index_elements=["city", "county"],
+                set_={column: statement.excluded[column] for column in columns},
+            )
+            session.execute(statement)
+
+    def ingest_catalog(
+        self,
+        catalog: LocationCatalog,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Store a catalog, e.g. the one returned by APIService.get_locations.
+
+        Args:
+            catalog (LocationCatalog): Locations to store.
+            chunk_size (int): Rows per statement.
+
+        Returns:
+            int: Number of rows written.
+        """
+        return self.bulk_upsert_locations(catalog, chunk_size)
+
+    def bulk_get(
+        self,
+        keys: Iterable[tuple[str, str]],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> dict[tuple[str, str], Location]:
+        """
+        Fetch many locations by (city, county) in one query per chunk.
+
+        Args:
+            keys (Iterable[tuple[str, str]]): City and county pairs.
+            chunk_size (int): Keys per query.
+
+        Returns:
+            dict[tuple[str, str], Location]: Stored locations by key; missing keys are left out.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with Session(self._engine) as session:
+            for start in range(0, len(keys), chunk_size):
+                statement = select(Location).where(
+                    tuple_(Location.city, Location.county).in_(keys[start:start + chunk_size])
+                )
+                for location in session.exec(statement):
+                    found[(location.city, location.county)] = location
+        return found
@@ -0,0 +1,44 @@
+"""locations_city_county_unique
+
+Revision ID: 5c1e7a9b2f40
+Revises: d8304f547526
+Create Date: 2026-10-17 10:12:31.482109
+
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9b2f40'
+down_revision: str | None = 'd8304f547526'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SERVICE_COLUMNS = ('medical', 'fire', 'police', 'rescue', 'utility')
+
+
+def upgrade() -> None:
+    # Earlier runs inserted a new row per location on every ingest, so keep one row
+    # per (city, county): the one with the most stock, then the lowest ID.
+    total = ' + '.join(SERVICE_COLUMNS)
+    op.execute(sa.text(
+        'DELETE FROM locations WHERE location_id IN ('
+        '    SELECT location_id FROM ('
+        '        SELECT location_id, ROW_NUMBER() OVER ('
+        f'            PARTITION BY city, county ORDER BY {total} DESC, location_id'
+        '        ) AS position FROM locations'
+        '    ) AS ranked WHERE position > 1'
+        ')'
+    ))
+    for column in SERVICE_COLUMNS:
+        op.alter_column('locations', column, server_default=sa.text('0'))
+    op.create_unique_constraint('uq_locations_city_county', 'locations', ['city', 'county'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_locations_city_county', 'locations', type_='unique')
+    for column in SERVICE_COLUMNS:
+        op.alter_column('locations', column, server_default=None)
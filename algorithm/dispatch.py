@@ -0,0 +1,72 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from records import LocationRecord
+from api_service import APIService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DispatchOrder:
+    """A quantity of one service to send from a supplier."""
+    resource: str
+    source: LocationRecord
+    quantity: int
+
+
+class DispatchExecutor:
+    """
+    Submits the dispatches of a plan concurrently.
+
+    Wall time per plan is roughly the slowest dispatch instead of the sum of all of
+    them. Each order succeeds or fails on its own so the caller can re-plan only
+    what failed.
+    """
+
+    def __init__(self, api_service: APIService):
+        self.api_service = api_service
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(api_service.algorithm_config.dispatch_workers, 1),
+            thread_name_prefix="dispatch",
+        )
+
+    def _dispatch(self, target: LocationRecord, order: DispatchOrder) -> bool:
+        logger.info(f"Dispatching {order.quantity} {order.resource} from {order.source.city} to {target.city}")
+        return self.api_service.dispatch_service_to_city(
+            order.resource,
+            order.source.city,
+            order.source.county,
+            target.city,
+            target.county,
+            order.quantity,
+        )
+
+    def execute(self, target: LocationRecord, plan: list[DispatchOrder]) -> list[DispatchOrder]:
+        """
+        Send every order of a plan.
+
+        Args:
+            target (LocationRecord): Location receiving the dispatches.
+            plan (list[DispatchOrder]): Orders to send.
+
+        Returns:
+            list[DispatchOrder]: Orders the API did not confirm.
+        """
+        if len(plan) <= 1:
+            return [order for order in plan if not self._dispatch(target, order)]
+
+        futures = [(order, self._pool.submit(self._dispatch, target, order)) for order in plan]
+        failed = []
+        for order, future in futures:
+            try:
+                if not future.result():
+                    failed.append(order)
+            except Exception as e:
+                logger.warning(f"Dispatch of {order.resource} from {order.source.city} raised: {e}")
+                failed.append(order)
+        return failed
+
+    def shutdown(self):
+        """Stop the worker threads."""
+        self._pool.shutdown(wait=True)
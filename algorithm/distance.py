@@ -0,0 +1,145 @@
+import logging
+from collections.abc import Iterable
+import numpy as np
+from records import LocationRecord
+from catalog import LocationCatalog
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+DISTANCE_METRICS = ("euclidean", "haversine")
+
+
+def pairwise_distances(lat1, lon1, lat2, lon2, metric: str = "euclidean") -> np.ndarray:
+    """
+    Vectorized distance between coordinate arrays, broadcasting like NumPy.
+
+    Args:
+        lat1, lon1: Coordinates of the first points, in degrees.
+        lat2, lon2: Coordinates of the second points, in degrees.
+        metric (str): "euclidean" over raw degrees or "haversine" in kilometres.
+
+    Returns:
+        np.ndarray: Distances.
+    """
+    if metric == "euclidean":
+        return np.hypot(np.subtract(lat2, lat1), np.subtract(lon2, lon1))
+    if metric == "haversine":
+        phi1, phi2 = np.radians(lat1), np.radians(lat2)
+        half_dphi = (phi2 - phi1) / 2
+        half_dlambda = np.radians(np.subtract(lon2, lon1)) / 2
+        a = np.sin(half_dphi) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(half_dlambda) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    raise ValueError(f"Unknown distance metric: {metric}")
+
+
+def project_coordinates(lat, lon, metric: str = "euclidean") -> np.ndarray:
+    """
+    Project coordinates into a space where straight-line distance preserves the metric's order.
+
+    Euclidean distances are taken over (lat, lon) directly. For haversine the points
+    are mapped onto the unit sphere, where chord length grows with great-circle
+    distance, so nearest-neighbour order is exact.
+
+    Args:
+        lat, lon: Coordinates in degrees.
+        metric (str): Distance metric.
+
+    Returns:
+        np.ndarray: Points of shape (n, 2) or (n, 3).
+    """
+    lat = np.atleast_1d(np.asarray(lat, dtype=float))
+    lon = np.atleast_1d(np.asarray(lon, dtype=float))
+    if metric == "euclidean":
+        return np.column_stack((lat, lon))
+    if metric == "haversine":
+        phi, lam = np.radians(lat), np.radians(lon)
+        return np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+    raise ValueError(f"Unknown distance metric: {metric}")
+
+
+def coordinates(locations: Iterable[LocationRecord]) -> tuple[np.ndarray, np.ndarray]:
+    """Extract latitude and longitude arrays from locations; a catalog hands over its columns."""
+    if isinstance(locations, LocationCatalog):
+        return locations.coordinates()
+    points = [(loc.latitude, loc.longitude) for loc in locations]
+    array = np.array(points, dtype=float).reshape(-1, 2)
+    return array[:, 0], array[:, 1]
+
+
+class DistanceMatrix:
+    """
+    Precomputed destination x supplier distances.
+
+    Rows for catalog destinations are computed once at startup with a single
+    vectorized call. Destinations outside the catalog, or every destination when the
+    matrix would exceed max_cells, are computed on demand, still one row at a time.
+    """
+
+    def __init__(
+        self,
+        suppliers: list[LocationRecord],
+        destinations: LocationCatalog | list[LocationRecord],
+        metric: str = "euclidean",
+        max_cells: int = 4_000_000,
+    ):
+        if metric not in DISTANCE_METRICS:
+            raise ValueError(f"Unknown distance metric: {metric}")
+        self.metric = metric
+        self.suppliers = list(suppliers)
+        self.supplier_positions = {(loc.city, loc.county): i for i, loc in enumerate(self.suppliers)}
+        self.supplier_lat, self.supplier_lon = coordinates(self.suppliers)
+
+        self._destination_positions = {(loc.city, loc.county): i for i, loc in enumerate(destinations)}
+        self._matrix: np.ndarray | None = None
+        if len(destinations) * len(self.suppliers) <= max_cells:
+            dest_lat, dest_lon = coordinates(destinations)
+            self._matrix = pairwise_distances(
+                dest_lat[:, None], dest_lon[:, None], self.supplier_lat[None, :], self.supplier_lon[None, :], metric
+            )
+        else:
+            logger.info(
+                f"Distance matrix of {len(destinations)}x{len(self.suppliers)} exceeds {max_cells} cells, "
+                "rows will be computed on demand."
+            )
+
+    def distances_from(self, location: LocationRecord) -> np.ndarray:
+        """
+        Distance from a location to every supplier.
+
+        Args:
+            location (LocationRecord): Destination.
+
+        Returns:
+            np.ndarray: One distance per supplier, in supplier order.
+        """
+        if self._matrix is not None:
+            row = self._destination_positions.get((location.city, location.county))
+            if row is not None:
+                return self._matrix[row]
+        return pairwise_distances(location.latitude, location.longitude, self.supplier_lat, self.supplier_lon, self.metric)
+
+    def distance(self, supplier: LocationRecord, destination: LocationRecord) -> float:
+        """Distance between a supplier and a destination."""
+        position = self.supplier_positions.get((supplier.city, supplier.county))
+        if position is None:
+            return float(pairwise_distances(
+                supplier.latitude, supplier.longitude, destination.latitude, destination.longitude, self.metric
+            ))
+        return float(self.distances_from(destination)[position])
+
+    def costs(self, central: LocationRecord, source: LocationRecord) -> np.ndarray:
+        """
+        Vectorized DistanceCalculator.calculate_cost with every supplier as destination.
+
+        Args:
+            central (LocationRecord): Central location.
+            source (LocationRecord): Source location.
+
+        Returns:
+            np.ndarray: One cost per supplier, in supplier order.
+        """
+        center_distance = pairwise_distances(
+            central.latitude, central.longitude, source.latitude, source.longitude, self.metric
+        )
+        return self.distances_from(source) - center_distance
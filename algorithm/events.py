@@ -0,0 +1,133 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from config import DEFAULT_EVENT_LOG_MAX_BYTES, DEFAULT_EVENT_LOG_QUEUE_SIZE
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _segments(path: Path) -> list[Path]:
+    """Rotated segments of a log, oldest first."""
+    numbered = []
+    for candidate in path.parent.glob(f"{path.name}.*"):
+        suffix = candidate.name[len(path.name) + 1:]
+        if suffix.isdigit():
+            numbered.append((int(suffix), candidate))
+    return [segment for _, segment in sorted(numbered)]
+
+
+class EventLog:
+    """
+    Append-only JSON-lines log of a run, written by a background thread.
+
+    Recording an event only enqueues it; serialization and file writes happen on
+    the writer thread, so callers on the dispatch path never wait for the disk.
+    When the queue is full the event is dropped and counted instead of blocking.
+    The file is rotated to numbered segments (events.jsonl.1, .2, ...) once it
+    reaches the size limit. A log without a path records nothing.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None,
+        max_bytes: int = DEFAULT_EVENT_LOG_MAX_BYTES,
+        queue_size: int = DEFAULT_EVENT_LOG_QUEUE_SIZE,
+    ):
+        self.path = Path(path) if path else None
+        self.enabled = self.path is not None
+        self.max_bytes = max_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._dropped = get_metrics().counter("event_log_dropped_total", "Events dropped because the queue was full.")
+        self._thread: threading.Thread | None = None
+        if self.enabled:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+
+    def record(self, kind: str, **fields):
+        """
+        Queue an event for writing.
+
+        Args:
+            kind (str): Event type, e.g. emergency or dispatch.
+            **fields: JSON-serializable event data.
+        """
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait({"ts": time.time(), "kind": kind, **fields})
+        except queue.Full:
+            self._dropped.inc()
+
+    def _rotate(self):
+        segments = _segments(self.path)
+        last = int(segments[-1].name.rsplit(".", 1)[1]) if segments else 0
+        self.path.rename(self.path.with_name(f"{self.path.name}.{last + 1}"))
+
+    def _run(self):
+        file = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+        size = file.tell()
+        try:
+            while True:
+                event = self._queue.get()
+                if event is _STOP:
+                    break
+                try:
+                    line = json.dumps(event, separators=(",", ":"), default=str) + "\n"
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Skipping event that cannot be serialized: {e}")
+                    continue
+                file.write(line)
+                size += len(line)
+                if size >= self.max_bytes:
+                    file.close()
+                    self._rotate()
+                    file = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+                    size = 0
+                elif self._queue.empty():
+                    file.flush()
+        except OSError as e:
+            logger.error(f"Event log writer stopped: {e}")
+        finally:
+            file.close()
+
+    def close(self):
+        """Write every queued event and stop the writer thread."""
+        if self._thread is None:
+            return
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        self._thread = None
+
+
+def read_events(path: str | Path) -> Iterator[dict]:
+    """
+    Stream the events of a log, including its rotated segments, in write order.
+
+    Args:
+        path (str | Path): Path of the current log file.
+
+    Yields:
+        dict: One event per line. A truncated last line is skipped.
+    """
+    path = Path(path)
+    files = _segments(path) + ([path] if path.exists() else [])
+    for file_path in files:
+        with open(file_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed event line in {file_path}.")
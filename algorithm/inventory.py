@@ -0,0 +1,288 @@
+import logging
+import math
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from models import RESOURCE_FIELDS
+from records import LocationRecord
+from api_service import APIService
+from catalog import LocationCatalog
+
+logger = logging.getLogger(__name__)
+
+# Fetches a reconcile makes before giving up on a supplier whose dispatches keep settling.
+RECONCILE_ATTEMPTS = 3
+
+
+class InventoryLedger:
+    """
+    In-memory ledger of the services available at every supplier.
+
+    The ledger is seeded once from the API and debited locally as dispatches are
+    planned, so the solver only needs the network to dispatch. A debit stays reserved
+    until settle() reports its dispatch as sent. Entries can be reconciled against
+    the API when a dispatch outcome is unknown or on a fixed interval; units still
+    reserved are subtracted from what the API reports, since the API does not know
+    about them yet. Updates are thread-safe. Watchers are told about suppliers whose stock
+    of a service ran out or was corrected by a reconcile.
+    """
+
+    def __init__(self, api_service: APIService):
+        self.api_service = api_service
+        self.reconcile_interval = api_service.algorithm_config.inventory_reconcile_interval
+        self._stock: dict[tuple[str, str], dict[str, int]] = {}
+        self._emergencies_since_reconcile = 0
+        self._watchers: list[Callable[[str, str], None]] = []
+        self._stocked_at_seed: set[tuple[str, str]] = set()
+        self._unread_at_seed: set[tuple[str, str]] = set()
+        self._reserved: dict[tuple[str, str], dict[str, int]] = {}
+        self._settled: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, callback: Callable[[str, str], None]):
+        """
+        Register a callback for availability changes.
+
+        The callback receives the city and county of the supplier and is called
+        outside the ledger lock, so it may read the ledger.
+
+        Args:
+            callback (Callable[[str, str], None]): Function to call on changes.
+        """
+        self._watchers.append(callback)
+
+    def _notify(self, city: str, county: str):
+        for callback in self._watchers:
+            callback(city, county)
+
+    def _fetch(self, city: str, county: str) -> dict[str, int] | None:
+        stock = {}
+        for field in RESOURCE_FIELDS:
+            quantity = self.api_service.get_service_for_city(field, city, county)
+            if quantity is None:
+                return None
+            stock[field] = quantity
+        return stock
+
+    def seed(
+        self, locations: LocationCatalog | Iterable[LocationRecord], workers: int = 1, ready_fraction: float = 1.0
+    ) -> threading.Thread:
+        """
+        Load the availability of every location from the API.
+
+        Locations are fetched in the given order by a bounded pool of workers and
+        watchers are notified as each one arrives, so callers can start using the
+        ledger before the scan is over. The call returns once the requested share
+        of locations is loaded; the rest keep loading in the background.
+
+        Args:
+            locations (LocationCatalog | Iterable[LocationRecord]): Locations to track, most useful first.
+            workers (int): Locations fetched in parallel.
+            ready_fraction (float): Share of locations to load before returning.
+
+        Returns:
+            threading.Thread: Thread loading the remaining locations; join it to wait for the full scan.
+        """
+        locations = list(locations)
+        total = len(locations)
+        needed = math.ceil(total * min(max(ready_fraction, 0.0), 1.0))
+        report_every = max(total // 10, 1)
+        ready = threading.Event()
+        loaded = 0
+
+        def load(loc: LocationRecord):
+            nonlocal loaded
+            key = (loc.city, loc.county)
+            try:
+                stock = self._fetch(loc.city, loc.county)
+                with self._lock:
+                    if stock is None:
+                        self._unread_at_seed.add(key)
+                        stock = {field: 0 for field in RESOURCE_FIELDS}
+                    self._stock[key] = stock
+                    if any(stock.values()):
+                        self._stocked_at_seed.add(key)
+                self._notify(loc.city, loc.county)
+            except BaseException:
+                with self._lock:
+                    self._unread_at_seed.add(key)
+                raise
+            finally:
+                with self._lock:
+                    loaded += 1
+                    count = loaded
+                if count % report_every == 0 or count == total:
+                    logger.info(f"Inventory warm-up: {count}/{total} locations loaded.")
+                if count >= needed:
+                    ready.set()
+
+        def run():
+            with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="warmup") as pool:
+                for future in [pool.submit(load, loc) for loc in locations]:
+                    if future.exception() is not None:
+                        logger.error(f"Inventory warm-up failed for a location: {future.exception()}")
+            ready.set()
+            logger.info(f"Inventory ledger seeded with {len(self._stock)} locations.")
+
+        thread = threading.Thread(target=run, name="inventory-warmup", daemon=True)
+        thread.start()
+        ready.wait()
+        return thread
+
+    def load(self, stock: dict[tuple[str, str], dict[str, int]]):
+        """
+        Take known availability without asking the API, e.g. stock handed over by another process.
+
+        Args:
+            stock (dict[tuple[str, str], dict[str, int]]): Quantity per service, keyed by city and county.
+        """
+        with self._lock:
+            for key, services in stock.items():
+                self._stock[key] = dict(services)
+                if any(services.values()):
+                    self._stocked_at_seed.add(key)
+
+    def stocked_at_seed(self) -> set[tuple[str, str]]:
+        """Keys of the suppliers that held any stock when they were seeded."""
+        with self._lock:
+            return set(self._stocked_at_seed)
+
+    def unread_at_seed(self) -> set[tuple[str, str]]:
+        """Keys of the suppliers whose availability could not be read while seeding; they count as empty."""
+        with self._lock:
+            return set(self._unread_at_seed)
+
+    def snapshot(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, int]]:
+        """Copy the known availability of several suppliers."""
+        with self._lock:
+            return {key: dict(self._stock[key]) for key in keys if key in self._stock}
+
+    def availability(self, city: str, county: str) -> dict[str, int]:
+        """
+        Get the known availability of every service in a city.
+
+        Args:
+            city (str): City name.
+            county (str): County name.
+
+        Returns:
+            dict[str, int]: Quantity available per service.
+        """
+        stock = self._stock.get((city, county))
+        if stock is None:
+            return {field: 0 for field in RESOURCE_FIELDS}
+        return dict(stock)
+
+    def get(self, service_name: str, city: str, county: str) -> int:
+        """Get the known quantity of a single service in a city."""
+        stock = self._stock.get((city, county))
+        return stock.get(service_name, 0) if stock else 0
+
+    def total(self, city: str, county: str) -> int:
+        """Get the known quantity of all services in a city."""
+        stock = self._stock.get((city, county))
+        return sum(stock.values()) if stock else 0
+
+    def debit(self, service_name: str, city: str, county: str, quantity: int):
+        """
+        Subtract a planned quantity from a supplier and reserve it until settled.
+
+        Args:
+            service_name (str): Service type.
+            city (str): Supplier city.
+            county (str): Supplier county.
+            quantity (int): Quantity planned.
+        """
+        with self._lock:
+            stock = self._stock.get((city, county))
+            if stock is None:
+                return
+            stock[service_name] = max(stock.get(service_name, 0) - quantity, 0)
+            reserved = self._reserved.setdefault((city, county), {})
+            reserved[service_name] = reserved.get(service_name, 0) + quantity
+            depleted = stock[service_name] == 0
+        if depleted:
+            self._notify(city, county)
+
+    def settle(self, service_name: str, city: str, county: str, quantity: int):
+        """
+        Release a reservation once its dispatch was sent, whatever the outcome.
+
+        Args:
+            service_name (str): Service type.
+            city (str): Supplier city.
+            county (str): Supplier county.
+            quantity (int): Quantity that was debited.
+        """
+        key = (city, county)
+        with self._lock:
+            reserved = self._reserved.get(key)
+            if reserved is None or service_name not in reserved:
+                return
+            reserved[service_name] -= quantity
+            if reserved[service_name] <= 0:
+                del reserved[service_name]
+                if not reserved:
+                    del self._reserved[key]
+            self._settled[key] = self._settled.get(key, 0) + 1
+
+    def reconcile(self, city: str, county: str) -> bool:
+        """
+        Refresh a supplier from the API, keeping units reserved by unsettled dispatches.
+
+        A dispatch settling while the API is read may or may not be counted in the
+        answer, so the read is repeated; if that keeps happening the ledger is left as is.
+
+        Args:
+            city (str): Supplier city.
+            county (str): Supplier county.
+
+        Returns:
+            bool: True if the ledger disagreed with the API.
+        """
+        key = (city, county)
+        for _ in range(RECONCILE_ATTEMPTS):
+            with self._lock:
+                settled = self._settled.get(key, 0)
+            fresh = self._fetch(city, county)
+            if fresh is None:
+                logger.warning(f"Could not read availability of {city}; ledger left as is.")
+                return False
+            with self._lock:
+                if self._settled.get(key, 0) != settled:
+                    continue
+                reserved = self._reserved.get(key, {})
+                fresh = {field: max(quantity - reserved.get(field, 0), 0) for field, quantity in fresh.items()}
+                mismatch = self._stock.get(key) != fresh
+                self._stock[key] = fresh
+                break
+        else:
+            logger.warning(f"Dispatches from {city} kept settling during reconcile; ledger left as is.")
+            return False
+        if mismatch:
+            logger.info(f"Inventory mismatch for {city}, reconciled to {fresh}")
+            self._notify(city, county)
+        return mismatch
+
+    def reconcile_all(self) -> int:
+        """
+        Refresh every tracked supplier from the API.
+
+        Returns:
+            int: Number of suppliers that disagreed with the API.
+        """
+        mismatches = sum(self.reconcile(city, county) for city, county in list(self._stock))
+        logger.info(f"Inventory reconciled: {mismatches} mismatches out of {len(self._stock)} locations.")
+        return mismatches
+
+    def emergency_completed(self):
+        """Count a handled emergency and reconcile when the configured interval is reached."""
+        if self.reconcile_interval <= 0:
+            return
+        with self._lock:
+            self._emergencies_since_reconcile += 1
+            due = self._emergencies_since_reconcile >= self.reconcile_interval
+            if due:
+                self._emergencies_since_reconcile = 0
+        if due:
+            self.reconcile_all()
@@ -1,6 +1,18 @@
+import json
 import logging
-from models import LocationBase, EmergencyLocation
+import threading
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from records import LocationRecord, EmergencyRecord
 from api_service import APIService
+from batch_solver import MinCostFlowSolver
+from catalog import LocationCatalog
+from inventory import InventoryLedger
+from metrics import get_metrics, phase_timer, record_outcome, start_metrics_server
+from prefetch import CallQueue
+from ranking import RankedSuppliers
+from sharding import ShardCoordinator
+from snapshot import CatalogSnapshot
 from utils import EmergencySolver
 
 logger = logging.getLogger(__name__)
@@ -12,77 +24,200 @@ class AlgorithmEngine:
     Manages simulation state, including location ranking and emergency resolution.
     """
 
-    def __init__(self):
-        self.api_service = APIService()
-        self.solver = EmergencySolver(self.api_service)
-        self.locations = []
-        self.ranking = []
+    def __init__(self, api_service: APIService | None = None):
+        self.api_service = api_service or APIService()
+        self.inventory = InventoryLedger(self.api_service)
+        self.solver = EmergencySolver(self.api_service, self.inventory)
+        self.locations = LocationCatalog()
+        self.ranking: RankedSuppliers | None = None
+        self.calls: CallQueue | None = None
 
     def run(self):
         """Run the main algorithm loop for emergency handling."""
+        config = self.api_service.algorithm_config
+        metrics_server = start_metrics_server(config.metrics_port) if config.metrics_port > 0 else None
+
         self.api_service.start_simulation()
-        self.locations = self.api_service.get_locations()
-
-        epicenter_coords = self.solver.find_locations_epicenter(self.locations, "Maramureș")
-        epicenter = LocationBase(
-            county="Maramureș",
-            city="Epicenter",
-            latitude=epicenter_coords[0],
-            longitude=epicenter_coords[1],
+        snapshot = (
+            CatalogSnapshot(config.catalog_snapshot_dir, config.api_host, config.seed)
+            if config.catalog_snapshot_dir else None
+        )
+        cached = snapshot.load() if snapshot is not None and not config.catalog_snapshot_refresh else None
+        if cached is not None:
+            self.locations, stocked = cached
+        else:
+            self.locations, stocked = self.api_service.get_locations(), None
+        self.api_service.events.record(
+            "catalog", locations=[[loc.city, loc.county, loc.latitude, loc.longitude] for loc in self.locations]
         )
 
-        self.ranking = self.solver.rank_locations_by_distance(epicenter, self.locations)
-        emergency = self.api_service.next()
-
+        epicenter_coords = self.solver.find_locations_epicenter(self.locations, config.home_county)
+        epicenter = LocationRecord("Epicenter", config.home_county, float(epicenter_coords[0]), float(epicenter_coords[1]))
+
+        with phase_timer("rank"):
+            ranked = self.solver.rank_locations_by_distance(epicenter, self.locations)
+            self.solver.index_suppliers(ranked, self.locations)
+            self.ranking = self.solver.ranking
+
+        # Suppliers are activated as their availability arrives, nearest to the epicenter first.
+        # Suppliers a snapshot knows to start empty are never fetched.
+        if stocked is not None:
+            ranked = [loc for loc in ranked if (loc.city, loc.county) in stocked]
+        with phase_timer("availability"):
+            warmup = self.inventory.seed(ranked, config.warmup_workers, config.warmup_ready_fraction)
+
+        self.calls = CallQueue(self.api_service.next, config.prefetch_depth, config.max_active_calls).start()
+        if config.solver_strategy == "min_cost_flow":
+            self._run_batched(epicenter)
+        elif config.engine_mode == "concurrent":
+            self._run_concurrent(epicenter)
+        elif config.engine_mode == "sharded":
+            warmup.join()
+            self._run_sharded(epicenter)
+        else:
+            self._run_sequential(epicenter)
+
+        self.calls.close()
+        warmup.join()
+        if snapshot is not None and cached is None:
+            # Suppliers whose warm-up read failed are kept, so the next run reads them again.
+            snapshot.save(self.locations, self.inventory.stocked_at_seed() | self.inventory.unread_at_seed())
+        self.solver.executor.shutdown()
+        response = self.api_service.stop_simulation()
+        logger.info(f"Simulation ended. Response: {response}")
+        self.api_service.close()
+        self.api_service.events.close()
+        self._export_metrics()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+
+    def _export_metrics(self):
+        """Log the metrics summary and write it to the configured path, if any."""
+        summary = json.dumps(get_metrics().summary(), indent=2)
+        logger.info(f"Metrics summary: {summary}")
+        path = self.api_service.algorithm_config.metrics_summary_path
+        if path:
+            Path(path).write_text(summary)
+
+    def _run_sequential(self, epicenter: LocationRecord):
+        """Handle one emergency at a time."""
+        emergency = self.calls.next()
         while emergency is not None:
-            emergency_obj = self._parse_emergency(emergency)
-            indices_to_remove, completed = self.solver.solve_emergency(epicenter, emergency_obj, self.ranking)
-            logger.info(f"Emergency in {emergency_obj.city} completed: {completed}")
+            self._handle_emergency(epicenter, emergency)
+            emergency = self.calls.next()
 
-            for i in sorted(indices_to_remove, reverse=True):
-                del self.ranking[i]
+    def _run_concurrent(self, epicenter: LocationRecord):
+        """
+        Keep up to max_active_calls emergencies in flight.
 
-            emergency = self.api_service.next()
+        The main thread keeps fetching calls while workers solve and dispatch the
+        ones already received.
+        """
+        max_active_calls = max(self.api_service.algorithm_config.max_active_calls, 1)
+        slots = threading.BoundedSemaphore(max_active_calls)
+
+        def on_done(future: Future):
+            slots.release()
+            if future.exception() is not None:
+                logger.error(f"Emergency handling failed: {future.exception()}")
+
+        with ThreadPoolExecutor(max_workers=max_active_calls) as pool:
+            while True:
+                slots.acquire()
+                emergency = self.calls.next()
+                if emergency is None:
+                    slots.release()
+                    break
+                pool.submit(self._handle_emergency, epicenter, emergency).add_done_callback(on_done)
+
+    def _run_sharded(self, epicenter: LocationRecord):
+        """
+        Hand emergencies to worker processes that each own the suppliers of some counties.
 
-        response = self.api_service.stop_simulation()
-        logger.info(f"Simulation ended. Response: {response}")
+        The full inventory must be loaded first, since it is split between the workers.
+        """
+        config = self.api_service.algorithm_config
+        coordinator = ShardCoordinator(self.inventory, epicenter, self.locations, config.shard_count)
+        coordinator.start()
+        try:
+            coordinator.run(self.calls.next, self._record_completion, config.max_active_calls)
+        finally:
+            coordinator.stop()
+
+    def _run_batched(self, epicenter: LocationRecord):
+        """
+        Collect windows of emergencies and plan each window as one min-cost-flow problem.
+
+        The window is capped at max_active_calls, since the simulator never has more
+        calls open at once.
+        """
+        config = self.api_service.algorithm_config
+        window = max(min(config.batch_window, config.max_active_calls), 1)
+        batch_solver = MinCostFlowSolver(self.inventory, self.solver.distances)
+
+        end_of_stream = False
+        while not end_of_stream:
+            payloads = []
+            while len(payloads) < window:
+                payload = self.calls.next()
+                if payload is None:
+                    end_of_stream = True
+                    break
+                payloads.append(payload)
+            if not payloads:
+                break
+            with phase_timer("parse"):
+                emergencies = EmergencyRecord.from_payloads(payloads)
+
+            with self.solver.lock, phase_timer("availability"):
+                plans = batch_solver.plan_batch(epicenter, emergencies)
+
+            for emergency_obj, (plan, completed) in zip(emergencies, plans):
+                unmet = self.solver.dispatch_plan(epicenter, emergency_obj, plan)
+                completed = completed and not any(unmet.values())
+                logger.info(f"Emergency in {emergency_obj.city} completed: {completed}")
+                self._record_completion(emergency_obj, completed)
+                self.inventory.emergency_completed()
+
+    def _handle_emergency(self, epicenter: LocationRecord, emergency: dict):
+        """
+        Solve and dispatch a single emergency payload.
 
-    def _parse_emergency(self, payload: dict) -> EmergencyLocation:
+        Args:
+            epicenter (LocationRecord): Epicenter of the supplier ranking.
+            emergency (dict): Raw payload.
         """
-        Parse raw emergency payload into EmergencyLocation instance.
+        # The call slot is freed exactly once: by _record_completion, or here if solving raised.
+        released = False
+        try:
+            with phase_timer("parse"):
+                emergency_obj = self._parse_emergency(emergency)
+            completed = self.solver.solve_emergency(epicenter, emergency_obj)
+            logger.info(f"Emergency in {emergency_obj.city} completed: {completed}")
+            released = True
+            self._record_completion(emergency_obj, completed)
+        finally:
+            if not released:
+                self.calls.done()
+        self.inventory.emergency_completed()
+
+    def _record_completion(self, emergency: EmergencyRecord, completed: bool):
+        """Count the outcome of an emergency, add it to the event log and free its call slot."""
+        self.calls.done()
+        record_outcome("completed" if completed else "incomplete")
+        self.api_service.events.record("completion", city=emergency.city, county=emergency.county, completed=completed)
+
+    def _parse_emergency(self, payload: dict) -> EmergencyRecord:
+        """
+        Parse raw emergency payload into an EmergencyRecord.
 
         Args:
             payload (dict): Raw payload.
 
         Returns:
-            EmergencyLocation: Parsed object.
+            EmergencyRecord: Parsed object.
         """
-        type_mapping = {
-            "Medical": "medical",
-            "Fire": "fire",
-            "Police": "police",
-            "Rescue": "rescue",
-            "Utility": "utility",
-        }
-
-        city = payload.get("city", "")
-        county = payload.get("county", "")
-        latitude = payload.get("latitude", 0.0)
-        longitude = payload.get("longitude", 0.0)
-        resource_data = {field: 0 for field in type_mapping.values()}
-
-        for req in payload.get("requests", []):
-            key = type_mapping.get(req.get("Type"))
-            if key:
-                resource_data[key] = req.get("Quantity", 0)
-
-        return EmergencyLocation(
-            county=county,
-            city=city,
-            latitude=latitude,
-            longitude=longitude,
-            **resource_data,
-        )
+        return EmergencyRecord.from_payload(payload)
 
 
 if __name__ == "__main__":
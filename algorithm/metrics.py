@@ -0,0 +1,219 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Count of observations per bucket, plus their sum."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> "Histogram":
+        """Copy the histogram, with buckets, count and sum taken together."""
+        copy = Histogram(self.buckets)
+        with self._lock:
+            copy.counts = list(self.counts)
+            copy.count = self.count
+            copy.sum = self.sum
+        return copy
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and latency histograms, keyed by name and labels.
+
+    Updating a metric costs a dict lookup and a short lock, cheap enough to keep
+    enabled in production.
+    """
+
+    def __init__(self):
+        self._counters: dict[tuple, Counter] = {}
+        self._histograms: dict[tuple, Histogram] = {}
+        self._help: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        """Get or create a counter."""
+        key = self._key(name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+                self._help.setdefault(name, help)
+        return counter
+
+    def histogram(self, name: str, help: str = "", **labels) -> Histogram:
+        """Get or create a latency histogram, in seconds."""
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+                self._help.setdefault(name, help)
+        return histogram
+
+    @contextmanager
+    def timer(self, name: str, help: str = "", **labels):
+        """Observe the duration of a block in a histogram."""
+        histogram = self.histogram(name, help, **labels)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _format_labels(labels: tuple, extra: dict | None = None) -> str:
+        items = list(labels) + list((extra or {}).items())
+        if not items:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+    def _snapshot(self) -> tuple[list[tuple[tuple, int]], list[tuple[tuple, Histogram]]]:
+        """Copy every metric, sorted by key, without holding the lock while formatting."""
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+        return (
+            sorted((key, counter.value) for key, counter in counters),
+            sorted(((key, histogram.snapshot()) for key, histogram in histograms), key=lambda item: item[0]),
+        )
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        counters, histograms = self._snapshot()
+        lines = []
+        described = set()
+        for (name, labels), value in counters:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{self._format_labels(labels, {'le': bound})} {cumulative}")
+            lines.append(f"{name}_bucket{self._format_labels(labels, {'le': '+Inf'})} {histogram.count}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """Summarize every metric as plain JSON-serializable values."""
+        counter_values, histogram_copies = self._snapshot()
+        counters = {f"{name}{self._format_labels(labels)}": value for (name, labels), value in counter_values}
+        histograms = {
+            f"{name}{self._format_labels(labels)}": {
+                "count": histogram.count,
+                "sum": round(histogram.sum, 6),
+                "mean": round(histogram.sum / histogram.count, 6) if histogram.count else 0.0,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+            for (name, labels), histogram in histogram_copies
+        }
+        return {"counters": counters, "histograms": histograms}
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return MetricsRegistry()
+
+
+def phase_timer(phase: str):
+    """Time one engine phase, e.g. parse, rank, availability or dispatch."""
+    return get_metrics().timer("engine_phase_seconds", "Time spent per engine phase.", phase=phase)
+
+
+def record_outcome(outcome: str):
+    """Count a handled emergency by outcome, e.g. completed or incomplete."""
+    get_metrics().counter("engine_emergencies_total", "Handled emergencies by outcome.", outcome=outcome).inc()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve the registry on /metrics in the Prometheus text format from a daemon thread.
+
+    Args:
+        port (int): Port to listen on.
+        host (str): Address to bind.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            content = get_metrics().render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Metrics available on http://{host}:{port}/metrics")
+    return server
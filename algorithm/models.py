@@ -1,10 +1,16 @@
 import uuid
 
+from sqlalchemy import UniqueConstraint
 from sqlmodel import (
     Field,
     SQLModel
 )
 
+RESOURCE_FIELDS = ["medical", "fire", "police", "rescue", "utility"]
+# Service names used in emergency payloads, mapped to resource fields.
+SERVICE_TYPES = {field.capitalize(): field for field in RESOURCE_FIELDS}
+
+
 class BaseSQLModel(SQLModel):
     """By default, SQLModel classes with table=True does not validate member types.
 
@@ -43,5 +49,11 @@ class EmergencyLocation(LocationBase):
 class Location(LocationBase, table=True):
     """Location model for database."""
     __tablename__ = "locations"
-
-    location_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
\ No newline at end of file
+    __table_args__ = (UniqueConstraint("city", "county", name="uq_locations_city_county"),)
+
+    location_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    medical: int = 0
+    fire: int = 0
+    police: int = 0
+    rescue: int = 0
+    utility: int = 0
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+import numpy as np
+from distance import DistanceMatrix
+from metrics import get_metrics
+from records import LocationRecord
+
+
+class SupplierOrder:
+    """
+    Supplier positions sorted by distance to one point, read lazily.
+
+    Depleted suppliers are never removed eagerly: readers skip them, and the order
+    remembers how many leading suppliers are retired for good so later reads start
+    after them. The caller passes a generation that changes whenever a retired
+    supplier is reactivated, which makes the next read start from the first
+    supplier again.
+    """
+
+    __slots__ = ("order", "head", "generation")
+
+    def __init__(self, order: np.ndarray):
+        self.order = order.astype(np.int32)
+        self.head = 0
+        self.generation = 0
+
+    def positions(self, retired: Callable[[int], bool], generation: int) -> Iterator[int]:
+        """
+        Positions in distance order, past the leading retired ones.
+
+        Args:
+            retired (Callable[[int], bool]): Whether the supplier at a position is out
+                of stock for every resource.
+            generation (int): Count of supplier reactivations so far.
+
+        Yields:
+            int: Supplier positions, some of which may be retired.
+        """
+        if generation != self.generation:
+            self.head = 0
+            self.generation = generation
+        order = self.order
+        leading = True
+        for i in range(self.head, len(order)):
+            position = int(order[i])
+            if leading:
+                if retired(position):
+                    self.head = i + 1
+                    continue
+                leading = False
+            yield position
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class SupplierOrderCache:
+    """
+    Bounded LRU cache of the suppliers nearest to each destination.
+
+    An entry is a SupplierOrder over the prefix_length suppliers nearest to a
+    destination (city, county), by position in the supplier order of the distance
+    matrix. Memory is capacity x prefix_length positions whatever the map size.
+
+    The cache is not locked; EmergencySolver only reads it under its own lock.
+    """
+
+    def __init__(self, distances: DistanceMatrix, capacity: int, prefix_length: int):
+        self.distances = distances
+        self.capacity = max(capacity, 0)
+        self.prefix_length = max(prefix_length, 1)
+        self._entries: OrderedDict[tuple[str, str], SupplierOrder] = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+        metrics = get_metrics()
+        help_text = "Supplier order cache lookups by result."
+        self._hits = metrics.counter("supplier_order_cache_total", help_text, result="hit")
+        self._misses = metrics.counter("supplier_order_cache_total", help_text, result="miss")
+        self._evictions = metrics.counter("supplier_order_cache_evictions_total", "Supplier orders evicted from the cache.")
+
+    def _build(self, destination: LocationRecord) -> SupplierOrder:
+        distances = self.distances.distances_from(destination)
+        if len(distances) <= self.prefix_length:
+            return SupplierOrder(np.argsort(distances, kind="stable"))
+        nearest = np.argpartition(distances, self.prefix_length - 1)[:self.prefix_length]
+        return SupplierOrder(nearest[np.lexsort((nearest, distances[nearest]))])
+
+    def get(self, destination: LocationRecord) -> SupplierOrder:
+        """
+        Get the nearest suppliers of a destination, building them on a miss.
+
+        Args:
+            destination (LocationRecord): Destination.
+
+        Returns:
+            SupplierOrder: Its nearest suppliers; every supplier on small maps.
+        """
+        key = (destination.city, destination.county)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._hits.inc()
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        self._misses.inc()
+        entry = self._build(destination)
+        if self.capacity > 0:
+            self._entries[key] = entry
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                self._evictions.inc()
+        return entry
+
+    def stats(self) -> dict:
+        """Hits, misses, evictions and current size of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,107 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+# Seconds the producer waits on a full queue before checking whether it was closed.
+_PUT_POLL_INTERVAL = 0.1
+
+
+class CallQueue:
+    """
+    Source of emergency calls, optionally fetched ahead by a background thread.
+
+    With a depth above 0 a producer keeps up to depth calls waiting in memory, so
+    the engine no longer pays the /calls/next round trip between emergencies.
+    Every fetched call counts as open until done() is called for it, and the
+    producer never holds more than max_outstanding calls open, since the API drops
+    the oldest open call beyond max_active_calls. The end of the call stream, or a
+    fetch that failed after every retry, is queued as a sentinel that every later
+    next() returns as None, like APIService.next does.
+    """
+
+    def __init__(self, fetch: Callable[[], dict | None], depth: int, max_outstanding: int):
+        self.fetch = fetch
+        self.max_outstanding = max(max_outstanding, 1)
+        self.depth = max(min(depth, self.max_outstanding), 0)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(self.depth, 1))
+        self._slots = threading.Semaphore(self.max_outstanding)
+        self._closed = threading.Event()
+        self._ended = False
+        self._error: BaseException | None = None
+        self._thread: threading.Thread | None = None
+        self._wait = get_metrics().histogram("call_queue_wait_seconds", "Time the engine waited for the next call.")
+
+    def start(self) -> "CallQueue":
+        """Start the producer thread, if prefetching is enabled."""
+        if self.depth > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name="call-prefetch", daemon=True)
+            self._thread.start()
+            logger.info(f"Prefetching up to {self.depth} calls, at most {self.max_outstanding} open.")
+        return self
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=_PUT_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        item = _END
+        try:
+            while not self._closed.is_set():
+                self._slots.acquire()
+                if self._closed.is_set():
+                    break
+                payload = self.fetch()
+                if payload is None:
+                    break
+                if not self._put(payload):
+                    return
+        except Exception as e:
+            logger.error(f"Call prefetching stopped: {e}")
+            self._error = e
+        finally:
+            self._put(item)
+
+    def next(self) -> dict | None:
+        """
+        Get the next call.
+
+        Returns:
+            dict | None: Raw payload, or None once the stream has ended.
+        """
+        if self._thread is None:
+            return self.fetch()
+        if self._ended:
+            return None
+        started = time.perf_counter()
+        item = self._queue.get()
+        self._wait.observe(time.perf_counter() - started)
+        if item is _END:
+            self._ended = True
+            if self._error is not None:
+                raise self._error
+            return None
+        return item
+
+    def done(self):
+        """Mark a call returned by next() as handled, freeing its place for another prefetch."""
+        if self._thread is not None:
+            self._slots.release()
+
+    def close(self):
+        """Stop the producer; calls still queued are discarded."""
+        self._closed.set()
+        if self._thread is not None:
+            self._slots.release()
+            self._thread.join()
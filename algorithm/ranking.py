@@ -0,0 +1,131 @@
+import copy
+from collections.abc import Hashable, Iterator, Sequence
+from typing import Any
+
+
+class RankedSuppliers:
+    """
+    Fixed ranking of suppliers with O(log n) removal and reactivation by key.
+
+    Rank positions never change; a Fenwick tree over them counts the live suppliers
+    ahead of any position, which finds the k-th live supplier in O(log n). Iterating
+    while suppliers are removed or restored stays consistent: each step resumes
+    after the position of the previous supplier.
+    """
+
+    def __init__(self, keys: Sequence[Hashable], items: Sequence[Any]):
+        self._items = list(items)
+        self._keys = list(keys)
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+        self._alive = [True] * len(self._items)
+        self._count = len(self._items)
+
+        size = len(self._items)
+        self._tree = [0] * (size + 1)
+        for i in range(1, size + 1):
+            self._tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= size:
+                self._tree[parent] += self._tree[i]
+        self._step = 1 << size.bit_length() - 1 if size else 0
+
+    def _add(self, position: int, delta: int):
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, end: int) -> int:
+        """Live suppliers among positions [0, end)."""
+        total = 0
+        while end > 0:
+            total += self._tree[end]
+            end -= end & -end
+        return total
+
+    def _find(self, rank: int) -> int:
+        """Position of the live supplier with the given zero-based rank."""
+        position = 0
+        step = self._step
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= rank:
+                position = following
+                rank -= self._tree[following]
+            step >>= 1
+        return position
+
+    def remove(self, key: Hashable) -> bool:
+        """
+        Exclude a supplier from the ranking.
+
+        Args:
+            key (Hashable): Supplier key.
+
+        Returns:
+            bool: True if the supplier was live.
+        """
+        position = self._positions.get(key)
+        if position is None or not self._alive[position]:
+            return False
+        self._alive[position] = False
+        self._count -= 1
+        self._add(position, -1)
+        return True
+
+    def restore(self, key: Hashable) -> bool:
+        """
+        Put a removed supplier back at its original rank.
+
+        Args:
+            key (Hashable): Supplier key.
+
+        Returns:
+            bool: True if the supplier was removed before.
+        """
+        position = self._positions.get(key)
+        if position is None or self._alive[position]:
+            return False
+        self._alive[position] = True
+        self._count += 1
+        self._add(position, 1)
+        return True
+
+    def copy(self) -> "RankedSuppliers":
+        """Independent ranking in the same order, with its own set of live suppliers."""
+        ranking = copy.copy(self)
+        ranking._alive = list(self._alive)
+        ranking._tree = list(self._tree)
+        return ranking
+
+    def rank(self, key: Hashable) -> int:
+        """Number of live suppliers ranked ahead of a supplier."""
+        return self._prefix(self._positions[key])
+
+    def keys(self) -> Iterator[Hashable]:
+        """Keys of the live suppliers in rank order."""
+        for position in self._live_positions():
+            yield self._keys[position]
+
+    def _live_positions(self) -> Iterator[int]:
+        rank = 0
+        while rank < self._count:
+            position = self._find(rank)
+            yield position
+            rank = self._prefix(position + 1)
+
+    def __getitem__(self, rank: int) -> Any:
+        if not 0 <= rank < self._count:
+            raise IndexError(rank)
+        return self._items[self._find(rank)]
+
+    def __contains__(self, key: Hashable) -> bool:
+        position = self._positions.get(key)
+        return position is not None and self._alive[position]
+
+    def __iter__(self) -> Iterator[Any]:
+        for position in self._live_positions():
+            yield self._items[position]
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,125 @@
+from collections.abc import Iterable
+from models import LocationBase, EmergencyLocation, RESOURCE_FIELDS, SERVICE_TYPES
+
+
+class LocationRecord:
+    """
+    Lightweight location used inside the engine.
+
+    Pydantic models validate on construction and carry a per-instance __dict__;
+    records use __slots__ and plain attributes, which matters with hundreds of
+    thousands of locations. Models are only used at the API and database boundaries.
+    """
+
+    __slots__ = ("city", "county", "latitude", "longitude")
+
+    def __init__(self, city: str, county: str, latitude: float, longitude: float):
+        self.city = city
+        self.county = county
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """City and county, the identity of a location."""
+        return self.city, self.county
+
+    @classmethod
+    def from_model(cls, location: LocationBase) -> "LocationRecord":
+        """Build a record from a validated model."""
+        return cls(location.city, location.county, location.latitude, location.longitude)
+
+    def to_model(self) -> LocationBase:
+        """Build the validated model of the record."""
+        return LocationBase(city=self.city, county=self.county, latitude=self.latitude, longitude=self.longitude)
+
+    def __repr__(self) -> str:
+        return f"LocationRecord({self.city!r}, {self.county!r}, {self.latitude}, {self.longitude})"
+
+
+class EmergencyRecord:
+    """Lightweight emergency used inside the engine: a location and the quantity needed per service."""
+
+    __slots__ = ("city", "county", "latitude", "longitude", *RESOURCE_FIELDS)
+
+    def __init__(
+        self, city: str, county: str, latitude: float, longitude: float,
+        medical: int = 0, fire: int = 0, police: int = 0, rescue: int = 0, utility: int = 0,
+    ):
+        self.city = city
+        self.county = county
+        self.latitude = latitude
+        self.longitude = longitude
+        self.medical = medical
+        self.fire = fire
+        self.police = police
+        self.rescue = rescue
+        self.utility = utility
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "EmergencyRecord":
+        """
+        Parse a raw emergency payload from the calls endpoint.
+
+        Request types go through the precomputed SERVICE_TYPES table and nothing is
+        validated beyond the numeric conversions, so parsing costs a few attribute
+        writes per call.
+
+        Args:
+            payload (dict): Raw payload.
+
+        Returns:
+            EmergencyRecord: Parsed emergency; unknown service types are ignored.
+        """
+        record = cls(
+            payload.get("city", ""),
+            payload.get("county", ""),
+            float(payload.get("latitude", 0.0)),
+            float(payload.get("longitude", 0.0)),
+        )
+        for req in payload.get("requests", ()):
+            field = SERVICE_TYPES.get(req.get("Type"))
+            if field is not None:
+                setattr(record, field, int(req.get("Quantity", 0)))
+        return record
+
+    @classmethod
+    def from_payloads(cls, payloads: Iterable[dict]) -> list["EmergencyRecord"]:
+        """
+        Parse several raw emergency payloads, e.g. a window of prefetched calls.
+
+        Args:
+            payloads (Iterable[dict]): Raw payloads.
+
+        Returns:
+            list[EmergencyRecord]: Parsed emergencies in the same order.
+        """
+        return [cls.from_payload(payload) for payload in payloads]
+
+    @classmethod
+    def from_model(cls, emergency: EmergencyLocation) -> "EmergencyRecord":
+        """Build a record from a validated model."""
+        return cls(
+            emergency.city, emergency.county, emergency.latitude, emergency.longitude,
+            **{field: getattr(emergency, field) for field in RESOURCE_FIELDS},
+        )
+
+    def to_model(self) -> EmergencyLocation:
+        """Build the validated model of the record."""
+        return EmergencyLocation(
+            city=self.city, county=self.county, latitude=self.latitude, longitude=self.longitude,
+            **self.needs(),
+        )
+
+    def needs(self) -> dict[str, int]:
+        """Quantity needed per service."""
+        return {field: getattr(self, field) for field in RESOURCE_FIELDS}
+
+    def replace(self, **changes) -> "EmergencyRecord":
+        """Copy the record with some fields changed, e.g. the needs left after a partial dispatch."""
+        values = {slot: getattr(self, slot) for slot in self.__slots__}
+        values.update(changes)
+        return EmergencyRecord(**values)
+
+    def __repr__(self) -> str:
+        return f"EmergencyRecord({self.city!r}, {self.county!r}, needs={self.needs()})"
@@ -0,0 +1,203 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from events import read_events
+from models import RESOURCE_FIELDS
+
+REPLAY_API_HOST = "http://replay.local"
+
+# Each strategy is a set of ALGORITHM_* overrides applied on top of the recorded run.
+STRATEGIES = {
+    "greedy": {},
+    "min-cost-flow": {"solver_strategy": "min_cost_flow"},
+    "haversine": {"distance_metric": "haversine"},
+}
+
+
+@dataclass
+class Recording:
+    """Inputs of a recorded run: the map, the starting inventory and the call stream."""
+    seed: str = ""
+    max_active_calls: int = 1
+    locations: list[dict] = field(default_factory=list)
+    stock: dict[tuple[str, str], dict[str, int]] = field(default_factory=dict)
+    emergencies: list[dict] = field(default_factory=list)
+
+
+def load_recording(path: str | Path) -> Recording:
+    """
+    Rebuild the inputs of the first run in an event log.
+
+    The starting inventory of a supplier is the first availability read of each
+    of its services, which the engine makes before any dispatch. Locations that
+    only appear as emergencies are added without stock.
+
+    Args:
+        path (str | Path): Event log written with ALGORITHM_EVENT_LOG_PATH.
+
+    Returns:
+        Recording: The recorded run.
+    """
+    recording = Recording()
+    started = False
+    for event in read_events(path):
+        kind = event.get("kind")
+        if kind == "start":
+            if started:
+                break
+            started = True
+            recording.seed = str(event.get("seed", ""))
+            recording.max_active_calls = int(event.get("maxActiveCalls", 1))
+        elif kind == "catalog":
+            recording.locations = [
+                {"city": city, "county": county, "latitude": latitude, "longitude": longitude}
+                for city, county, latitude, longitude in event["locations"]
+            ]
+        elif kind == "availability":
+            stock = recording.stock.setdefault((event["city"], event["county"]), {})
+            stock.setdefault(event["service"], event["quantity"])
+        elif kind == "emergency":
+            recording.emergencies.append(event["payload"])
+
+    # Emergencies may come from locations without any stock, which are not in the catalog.
+    known = {(location["city"], location["county"]) for location in recording.locations}
+    for payload in recording.emergencies:
+        key = (payload["city"], payload["county"])
+        if key not in known:
+            known.add(key)
+            recording.locations.append({
+                "city": payload["city"],
+                "county": payload["county"],
+                "latitude": payload["latitude"],
+                "longitude": payload["longitude"],
+            })
+    return recording
+
+
+def _simulator_for(recording: Recording):
+    """Build an EmergencySimulator that serves a recording instead of a generated map."""
+    from simulator import EmergencySimulator
+
+    class ReplaySimulator(EmergencySimulator):
+        def reset(self, seed: str, target_dispatches: int, max_active_calls: int):
+            self.locations = [dict(location) for location in recording.locations]
+            self.stock = {
+                (location["city"], location["county"]): {
+                    service: recording.stock.get((location["city"], location["county"]), {}).get(service, 0)
+                    for service in RESOURCE_FIELDS
+                }
+                for location in self.locations
+            }
+            self._coordinates = {
+                (loc["city"], loc["county"]): (loc["latitude"], loc["longitude"]) for loc in self.locations
+            }
+            self._calls = iter(recording.emergencies)
+            self._start(len(recording.emergencies), recording.max_active_calls)
+
+        def _generate_call(self) -> dict:
+            return next(self._calls)
+
+    return ReplaySimulator()
+
+
+def _configure(recording: Recording, overrides: dict) -> list[str]:
+    """Set the ALGORITHM_* variables of a replay and return the names that were set."""
+    settings = {
+        "api_host": REPLAY_API_HOST,
+        "seed": recording.seed,
+        "target_dispatches": len(recording.emergencies),
+        "max_active_calls": recording.max_active_calls,
+        "retry_count": 1,
+        "timeout": 1.0,
+        "engine_mode": "sequential",
+        "event_log_path": "",
+        "catalog_snapshot_dir": "",
+        "metrics_port": 0,
+        "metrics_summary_path": "",
+        **overrides,
+    }
+    names = []
+    for key, value in settings.items():
+        name = f"ALGORITHM_{key.upper()}"
+        os.environ[name] = str(value)
+        names.append(name)
+
+    from config import get_algorithm_config
+    get_algorithm_config.cache_clear()
+    return names
+
+
+def replay(recording: Recording, name: str, overrides: dict) -> dict:
+    """
+    Run AlgorithmEngine over a recording with in-memory inventory and no HTTP.
+
+    Args:
+        recording (Recording): Recorded run.
+        name (str): Strategy name for the report.
+        overrides (dict): ALGORITHM_* settings of the strategy.
+
+    Returns:
+        dict: Distance cost, completion rate and dispatch totals of the replay.
+    """
+    names = _configure(recording, overrides)
+    from api_service import APIResult, APIService
+    from main import AlgorithmEngine
+
+    simulator = _simulator_for(recording)
+
+    class ReplayAPIService(APIService):
+        def _send_request_with_retry(self, method: str, url: str, params: dict = None, body: dict = None):
+            status, payload = simulator.handle(method, url[len(REPLAY_API_HOST):], params or {}, body)
+            return APIResult(status == 200, payload if status == 200 else None)
+
+    try:
+        engine = AlgorithmEngine(ReplayAPIService())
+        started = time.perf_counter()
+        engine.run()
+        elapsed = time.perf_counter() - started
+    finally:
+        for variable in names:
+            os.environ.pop(variable, None)
+
+    calls = max(simulator.issued, 1)
+    return {
+        "strategy": name,
+        "calls": simulator.issued,
+        "completed": simulator.completed,
+        "completion_rate": round(simulator.completed / calls, 4),
+        "dispatches": simulator.dispatches,
+        "dispatched_units": simulator.dispatched_units,
+        "distance_cost": round(simulator.distance, 4),
+        "emergencies_per_sec": round(simulator.issued / elapsed, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded run against solver strategies without HTTP.")
+    parser.add_argument("event_log", type=Path, help="Event log written with ALGORITHM_EVENT_LOG_PATH.")
+    parser.add_argument("--strategy", action="append", choices=sorted(STRATEGIES), help="Strategy to run, repeatable. Defaults to all.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    recording = load_recording(args.event_log)
+    if not recording.emergencies:
+        print(f"No emergencies recorded in {args.event_log}.", file=sys.stderr)
+        return 1
+
+    results = [replay(recording, name, STRATEGIES[name]) for name in args.strategy or list(STRATEGIES)]
+    text = json.dumps({"event_log": str(args.event_log), "results": results}, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import numpy as np
+from records import LocationRecord, EmergencyRecord
+from catalog import LocationCatalog
+from config import get_algorithm_config
+from inventory import InventoryLedger
+
+logger = logging.getLogger(__name__)
+
+# Seconds between liveness checks of the workers while waiting for a result.
+RESULT_POLL_INTERVAL = 1.0
+
+
+def partition_counties(suppliers: list[LocationRecord], shard_count: int) -> dict[str, int]:
+    """
+    Assign counties to shards so each shard owns about the same number of suppliers.
+
+    Args:
+        suppliers (list[LocationRecord]): Suppliers to split.
+        shard_count (int): Number of shards.
+
+    Returns:
+        dict[str, int]: Shard of every county.
+    """
+    sizes: dict[str, int] = {}
+    for loc in suppliers:
+        sizes[loc.county] = sizes.get(loc.county, 0) + 1
+    load = [0] * max(shard_count, 1)
+    assignment = {}
+    for county in sorted(sizes, key=lambda c: (-sizes[c], c)):
+        shard = load.index(min(load))
+        assignment[county] = shard
+        load[shard] += sizes[county]
+    return assignment
+
+
+def _shard_main(
+    shard_id: int,
+    suppliers: list[tuple[str, str, float, float]],
+    destinations: list[tuple[str, str, float, float]],
+    stock: dict[tuple[str, str], dict[str, int]],
+    epicenter: tuple[str, str, float, float],
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+):
+    """Worker process: plan and dispatch emergencies from the suppliers of one shard."""
+    from api_service import APIService
+    from utils import EmergencySolver
+
+    config = get_algorithm_config()
+    os.environ["ALGORITHM_METRICS_PORT"] = "0"
+    if config.event_log_path:
+        os.environ["ALGORITHM_EVENT_LOG_PATH"] = f"{config.event_log_path}.shard{shard_id}"
+    get_algorithm_config.cache_clear()
+
+    def location(row: tuple[str, str, float, float]) -> LocationRecord:
+        return LocationRecord(*row)
+
+    api_service = APIService()
+    inventory = InventoryLedger(api_service)
+    inventory.load(stock)
+    solver = EmergencySolver(api_service, inventory)
+    center = location(epicenter)
+    local = [location(row) for row in suppliers]
+    solver.index_suppliers(solver.rank_locations_by_distance(center, local), LocationCatalog([location(row) for row in destinations]))
+
+    for task in iter(tasks.get, None):
+        task_id, payload, shortfall = task
+        emergency = EmergencyRecord.from_payload(payload)
+        if shortfall is not None:
+            emergency = emergency.replace(**shortfall)
+        with solver.lock:
+            plan, _ = solver.plan_emergency(center, emergency)
+        remaining = solver.dispatch_plan(center, emergency, plan)
+        results.put((task_id, remaining))
+
+    solver.executor.shutdown()
+    api_service.close()
+    api_service.events.close()
+
+
+@dataclass
+class _PendingEmergency:
+    emergency: EmergencyRecord
+    payload: dict
+    fallback: list[int] = field(default_factory=list)
+
+
+class ShardCoordinator:
+    """
+    Runs emergencies on worker processes that each own the suppliers of some counties.
+
+    Every supplier belongs to exactly one process, so inventory stays consistent
+    without shared state. An emergency goes to the shard owning its county first;
+    whatever that shard cannot cover is offered to the other shards in order of
+    their distance to the emergency, which takes the place of the cross-county
+    ranking done by rank_external_suppliers in a single process.
+    """
+
+    def __init__(self, inventory: InventoryLedger, epicenter: LocationRecord, locations: LocationCatalog, shard_count: int):
+        self.config = get_algorithm_config()
+        self.epicenter = epicenter
+        self.locations = locations
+        self.inventory = inventory
+
+        suppliers = [loc for loc in locations if inventory.total(loc.city, loc.county) > 0]
+        counties = {loc.county for loc in suppliers}
+        self.shard_count = max(min(shard_count or os.cpu_count() or 1, len(counties)), 1)
+        self.assignment = partition_counties(suppliers, self.shard_count)
+        self.members: list[list[LocationRecord]] = [[] for _ in range(self.shard_count)]
+        for loc in suppliers:
+            self.members[self.assignment[loc.county]].append(loc)
+        self.centroids = np.array([
+            [np.mean([loc.latitude for loc in members]), np.mean([loc.longitude for loc in members])]
+            if members else [epicenter.latitude, epicenter.longitude]
+            for members in self.members
+        ])
+
+        self._context = multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._tasks = []
+        self._processes = []
+
+    @staticmethod
+    def _row(loc: LocationRecord) -> tuple[str, str, float, float]:
+        return loc.city, loc.county, loc.latitude, loc.longitude
+
+    def start(self):
+        """Start one worker process per shard and hand it its suppliers and their stock."""
+        destinations = [self._row(loc) for loc in self.locations]
+        for shard_id, members in enumerate(self.members):
+            tasks = self._context.Queue()
+            stock = self.inventory.snapshot([(loc.city, loc.county) for loc in members])
+            process = self._context.Process(
+                target=_shard_main,
+                args=(shard_id, [self._row(loc) for loc in members], destinations, stock, self._row(self.epicenter), tasks, self._results),
+                name=f"shard-{shard_id}",
+                daemon=True,
+            )
+            process.start()
+            self._tasks.append(tasks)
+            self._processes.append(process)
+        logger.info(f"Started {self.shard_count} shard workers for {len(self.assignment)} counties.")
+
+    def stop(self):
+        """Let the workers finish their queued emergencies and exit."""
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._processes:
+            process.join()
+
+    def _shard_order(self, emergency: EmergencyRecord) -> list[int]:
+        distances = np.hypot(self.centroids[:, 0] - emergency.latitude, self.centroids[:, 1] - emergency.longitude)
+        order = [int(shard) for shard in np.argsort(distances, kind="stable")]
+        home = self.assignment.get(emergency.county)
+        if home is not None:
+            order.remove(home)
+            order.insert(0, home)
+        return order
+
+    def _next_result(self) -> tuple[int, dict[str, int]]:
+        while True:
+            try:
+                return self._results.get(timeout=RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                if any(not process.is_alive() for process in self._processes):
+                    raise RuntimeError("A shard worker exited unexpectedly.")
+
+    def run(
+        self,
+        next_call: Callable[[], dict | None],
+        on_complete: Callable[[EmergencyRecord, bool], None],
+        max_in_flight: int,
+    ):
+        """
+        Feed calls to the shards until the call stream ends.
+
+        Args:
+            next_call (Callable[[], dict | None]): Returns the next raw payload, or None at the end.
+            on_complete (Callable[[EmergencyRecord, bool], None]): Called with each emergency and
+                whether it was fully covered.
+            max_in_flight (int): Emergencies handled at once across all shards.
+        """
+        pending: dict[int, _PendingEmergency] = {}
+        task_ids = itertools.count()
+        end_of_stream = False
+        while not end_of_stream or pending:
+            while not end_of_stream and len(pending) < max(max_in_flight, 1):
+                payload = next_call()
+                if payload is None:
+                    end_of_stream = True
+                    break
+                emergency = EmergencyRecord.from_payload(payload)
+                order = self._shard_order(emergency)
+                task_id = next(task_ids)
+                pending[task_id] = _PendingEmergency(emergency, payload, order[1:])
+                self._tasks[order[0]].put((task_id, payload, None))
+            if not pending:
+                break
+
+            task_id, remaining = self._next_result()
+            entry = pending[task_id]
+            if any(quantity > 0 for quantity in remaining.values()) and entry.fallback:
+                self._tasks[entry.fallback.pop(0)].put((task_id, entry.payload, remaining))
+                continue
+
+            del pending[task_id]
+            on_complete(entry.emergency, not any(quantity > 0 for quantity in remaining.values()))
@@ -0,0 +1,351 @@
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from requests.adapters import BaseAdapter
+
+from config import ROOT_DIR
+from models import RESOURCE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Bounding box of Romania, where the real emulator places its map.
+MAP_BOUNDS = ((43.6, 48.3), (20.2, 29.7))
+COUNTY_NAMES = [
+    "Maramureș", "Cluj", "Bihor", "Satu Mare", "Sălaj", "Bistrița-Năsăud", "Suceava", "Iași",
+    "Alba", "Sibiu", "Brașov", "Mureș", "Timiș", "Arad", "Dolj", "Constanța",
+]
+
+
+class SimulatorConfig(BaseSettings):
+    """Configuration for the local dispatch API stand-in."""
+    host: str = "127.0.0.1"
+    port: int = 5000
+    seed: str = "default"
+    locations: int = 200
+    counties: int = 8
+    stock_probability: float = 0.5
+    max_stock: int = 6
+    max_requests_per_call: int = 3
+    max_request_quantity: int = 4
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    slow_probability: float = 0.0
+    slow_ms: float = 0.0
+    resource_weights: dict[str, float] = {}
+
+    model_config = SettingsConfigDict(
+        env_prefix="SIMULATOR_",
+        env_file=ROOT_DIR / Path(".env"),
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+
+class EmergencySimulator:
+    """
+    Deterministic stand-in for the emergency dispatch API.
+
+    The map, the inventory and the call stream depend only on the seed, so two runs
+    with the same seed and the same engine produce the same results. When the number
+    of open calls reaches maxActiveCalls, the oldest open call is dropped as missed.
+    """
+
+    def __init__(self, config: SimulatorConfig | None = None):
+        self.config = config or SimulatorConfig()
+        self._lock = threading.Lock()
+        self._latency_rng = random.Random(0)
+        self.reset(self.config.seed, 0, 1)
+
+    def reset(self, seed: str, target_dispatches: int, max_active_calls: int):
+        """
+        Build a new map and call stream.
+
+        Args:
+            seed (str): Seed for the map, inventory and calls.
+            target_dispatches (int): Number of calls to issue.
+            max_active_calls (int): Calls that may be open at once.
+        """
+        rng = random.Random(f"{seed}/map")
+        counties = COUNTY_NAMES[:max(1, min(self.config.counties, len(COUNTY_NAMES)))]
+        centers = {
+            county: (rng.uniform(*MAP_BOUNDS[0]), rng.uniform(*MAP_BOUNDS[1]))
+            for county in counties
+        }
+
+        self.locations = []
+        self.stock: dict[tuple[str, str], dict[str, int]] = {}
+        for i in range(self.config.locations):
+            county = counties[i % len(counties)]
+            lat, lon = centers[county]
+            location = {
+                "county": county,
+                "city": f"{county} {i // len(counties) + 1}",
+                "latitude": round(lat + rng.gauss(0, 0.3), 6),
+                "longitude": round(lon + rng.gauss(0, 0.4), 6),
+            }
+            self.locations.append(location)
+            self.stock[(location["city"], location["county"])] = {
+                service: rng.randint(1, self.config.max_stock) if rng.random() < self.config.stock_probability else 0
+                for service in RESOURCE_FIELDS
+            }
+        self._coordinates = {(loc["city"], loc["county"]): (loc["latitude"], loc["longitude"]) for loc in self.locations}
+
+        self._call_rng = random.Random(f"{seed}/calls")
+        self._start(target_dispatches, max_active_calls)
+
+    def _start(self, target_dispatches: int, max_active_calls: int):
+        """Clear the call queue and the totals of the previous run."""
+        self.target_dispatches = target_dispatches
+        self.max_active_calls = max(max_active_calls, 1)
+        self.active: deque[dict] = deque()
+        self.issued = self.completed = self.missed = 0
+        self.dispatches = self.dispatched_units = 0
+        self.distance = 0.0
+        self.requests = 0
+        self.call_latencies: list[float] = []
+        self.running = True
+
+    def _generate_call(self) -> dict:
+        rng = self._call_rng
+        location = rng.choice(self.locations)
+        count = rng.randint(1, self.config.max_requests_per_call)
+        if self.config.resource_weights:
+            pool = [service for service in RESOURCE_FIELDS if self.config.resource_weights.get(service, 0) > 0]
+            services = []
+            while pool and len(services) < count:
+                service = rng.choices(pool, [self.config.resource_weights[s] for s in pool])[0]
+                services.append(service)
+                pool.remove(service)
+        else:
+            services = rng.sample(RESOURCE_FIELDS, count)
+        return {
+            "county": location["county"],
+            "city": location["city"],
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+            "requests": [
+                {"Type": service.capitalize(), "Quantity": rng.randint(1, self.config.max_request_quantity)}
+                for service in services
+            ],
+        }
+
+    def next_call(self) -> dict | None:
+        """Issue the next call, or None once every call has been issued."""
+        if not self.running or self.issued >= self.target_dispatches:
+            return None
+        if len(self.active) >= self.max_active_calls:
+            self.active.popleft()
+            self.missed += 1
+        call = self._generate_call()
+        self.issued += 1
+        self.active.append({
+            "city": call["city"],
+            "county": call["county"],
+            "needs": {req["Type"].lower(): req["Quantity"] for req in call["requests"]},
+            "issued_at": time.perf_counter(),
+        })
+        return call
+
+    def search(self, service: str) -> list[dict]:
+        """List every location holding a service."""
+        return [
+            {**location, "quantity": self.stock[(location["city"], location["county"])][service]}
+            for location in self.locations
+            if self.stock[(location["city"], location["county"])][service] > 0
+        ]
+
+    def search_by_city(self, service: str, city: str, county: str) -> int:
+        """Quantity of a service held by a city."""
+        return self.stock.get((city, county), {}).get(service, 0)
+
+    def dispatch(self, service: str, body: dict) -> tuple[int, dict | str]:
+        """
+        Move units of a service from a source to a target and apply them to its open call.
+
+        Returns:
+            tuple[int, dict | str]: HTTP status and response payload.
+        """
+        source = (body.get("sourceCity"), body.get("sourceCounty"))
+        target = (body.get("targetCity"), body.get("targetCounty"))
+        quantity = int(body.get("quantity", 0))
+        if source not in self.stock or target not in self._coordinates or quantity <= 0:
+            return 400, "Invalid dispatch."
+        if self.stock[source][service] < quantity:
+            return 400, "Not enough units at source."
+
+        self.stock[source][service] -= quantity
+        self.dispatches += 1
+        self.dispatched_units += quantity
+        self.distance += quantity * math.dist(self._coordinates[source], self._coordinates[target])
+
+        remaining = quantity
+        for call in list(self.active):
+            if remaining <= 0:
+                break
+            if (call["city"], call["county"]) != target or call["needs"].get(service, 0) <= 0:
+                continue
+            applied = min(remaining, call["needs"][service])
+            call["needs"][service] -= applied
+            remaining -= applied
+            if all(need <= 0 for need in call["needs"].values()):
+                self.active.remove(call)
+                self.completed += 1
+                self.call_latencies.append(time.perf_counter() - call["issued_at"])
+        return 200, {"service": service, "quantity": quantity, "applied": quantity - remaining}
+
+    def summary(self) -> dict:
+        """Totals of the current run."""
+        return {
+            "calls": self.issued,
+            "completed": self.completed,
+            "missed": self.missed,
+            "open": len(self.active),
+            "dispatches": self.dispatches,
+            "dispatchedUnits": self.dispatched_units,
+            "distance": round(self.distance, 6),
+            "requests": self.requests,
+        }
+
+    def handle(self, method: str, path: str, params: dict, body: dict | None) -> tuple[int, object]:
+        """
+        Route an API request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+            params (dict): Query parameters.
+            body (dict | None): JSON body.
+
+        Returns:
+            tuple[int, object]: HTTP status and JSON-serializable payload, or None for an empty body.
+        """
+        delay = self.config.latency_ms + self._latency_rng.uniform(0, self.config.latency_jitter_ms)
+        if self._latency_rng.random() < self.config.slow_probability:
+            delay += self.config.slow_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        parts = [part for part in path.split("/") if part]
+        with self._lock:
+            self.requests += 1
+            if method == "POST" and parts == ["control", "reset"]:
+                self.reset(
+                    params.get("seed", self.config.seed),
+                    int(params.get("targetDispatches", 0)),
+                    int(params.get("maxActiveCalls", 1)),
+                )
+                return 200, {"status": "reset"}
+            if method == "POST" and parts == ["control", "stop"]:
+                self.running = False
+                return 200, self.summary()
+            if method == "GET" and parts == ["calls", "next"]:
+                return 200, self.next_call()
+            if len(parts) == 2 and parts[0] in RESOURCE_FIELDS:
+                service, action = parts
+                if method == "GET" and action == "search":
+                    return 200, self.search(service)
+                if method == "GET" and action == "searchbycity":
+                    return 200, self.search_by_city(service, params.get("city"), params.get("county"))
+                if method == "POST" and action == "dispatch":
+                    return self.dispatch(service, body or {})
+        return 404, "Not found."
+
+
+class InProcessAdapter(BaseAdapter):
+    """requests transport adapter that answers from an EmergencySimulator without sockets."""
+
+    def __init__(self, simulator: EmergencySimulator):
+        super().__init__()
+        self.simulator = simulator
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        body = json.loads(request.body) if request.body else None
+        status, payload = self.simulator.handle(request.method, url.path, dict(parse_qsl(url.query)), body)
+
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        response._content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        return response
+
+    def close(self):
+        pass
+
+
+def install(api_service, simulator: EmergencySimulator | None = None) -> EmergencySimulator:
+    """
+    Route an APIService to an in-process simulator instead of the network.
+
+    Args:
+        api_service (APIService): Service whose session should be redirected.
+        simulator (EmergencySimulator | None): Simulator to use, a new one by default.
+
+    Returns:
+        EmergencySimulator: The simulator answering the requests.
+    """
+    simulator = simulator or EmergencySimulator()
+    api_service.session.mount(api_service.algorithm_config.api_host, InProcessAdapter(simulator))
+    return simulator
+
+
+def make_request_handler(simulator: EmergencySimulator) -> type[BaseHTTPRequestHandler]:
+    """Build an HTTP request handler class bound to a simulator."""
+
+    class SimulatorRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _handle(self, method: str):
+            url = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length)) if length else None
+            status, payload = simulator.handle(method, url.path, dict(parse_qsl(url.query)), body)
+            content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return SimulatorRequestHandler
+
+
+def serve(config: SimulatorConfig | None = None):
+    """Run the simulator as a local HTTP server until interrupted."""
+    config = config or SimulatorConfig()
+    server = ThreadingHTTPServer((config.host, config.port), make_request_handler(EmergencySimulator(config)))
+    logger.info(f"Simulator listening on http://{config.host}:{config.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
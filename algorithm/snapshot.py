@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from records import LocationRecord
+from catalog import LocationCatalog
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class CatalogSnapshot:
+    """
+    Local snapshot of the location catalog for one API host and seed.
+
+    The snapshot stores the catalog column-wise in gzipped JSON together with the
+    suppliers worth reading on later runs: those that held stock when the inventory
+    was first loaded and those whose availability could not be read. A version, the
+    host, the seed and a checksum of the payload are checked on load; any mismatch
+    or read error is treated as a missing snapshot.
+    """
+
+    def __init__(self, directory: str | Path, api_host: str, seed: str):
+        self.api_host = api_host
+        self.seed = seed
+        digest = hashlib.sha1(f"{api_host}|{seed}".encode("utf-8")).hexdigest()[:16]
+        self.path = Path(directory) / f"catalog-{digest}.json.gz"
+
+    @staticmethod
+    def _checksum(payload: dict) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def load(self) -> tuple[LocationCatalog, set[tuple[str, str]]] | None:
+        """
+        Read the snapshot.
+
+        Returns:
+            tuple[LocationCatalog, set[tuple[str, str]]] | None: The catalog and the keys of
+            stocked suppliers, or None if there is no valid snapshot.
+        """
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable catalog snapshot {self.path}: {e}")
+            return None
+
+        payload = snapshot.get("payload", {})
+        if (
+            snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("api_host") != self.api_host
+            or snapshot.get("seed") != self.seed
+            or snapshot.get("checksum") != self._checksum(payload)
+        ):
+            logger.warning(f"Ignoring stale or corrupt catalog snapshot {self.path}.")
+            return None
+
+        columns = [payload["city"], payload["county"], payload["latitude"], payload["longitude"]]
+        if len({len(column) for column in columns}) > 1:
+            logger.warning(f"Ignoring catalog snapshot {self.path} with uneven columns.")
+            return None
+
+        catalog = LocationCatalog()
+        for city, county, latitude, longitude in zip(*columns):
+            catalog.add(LocationRecord(city, county, latitude, longitude))
+        keys = catalog.keys()
+        stocked = {keys[i] for i in payload["stocked"] if 0 <= i < len(keys)}
+        logger.info(f"Loaded {len(catalog)} locations from catalog snapshot {self.path}.")
+        return catalog, stocked
+
+    def save(self, catalog: LocationCatalog, stocked: set[tuple[str, str]]):
+        """
+        Write the snapshot, replacing any previous one atomically.
+
+        Args:
+            catalog (LocationCatalog): Locations to store.
+            stocked (set[tuple[str, str]]): Keys of suppliers to read on later runs.
+        """
+        locations = list(catalog)
+        payload = {
+            "city": [loc.city for loc in locations],
+            "county": [loc.county for loc in locations],
+            "latitude": [loc.latitude for loc in locations],
+            "longitude": [loc.longitude for loc in locations],
+            "stocked": [i for i, key in enumerate(catalog.keys()) if key in stocked],
+        }
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "api_host": self.api_host,
+            "seed": self.seed,
+            "checksum": self._checksum(payload),
+            "payload": payload,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        with gzip.open(temporary, "wt", encoding="utf-8") as file:
+            json.dump(snapshot, file, separators=(",", ":"))
+        os.replace(temporary, self.path)
+        logger.info(f"Saved catalog snapshot with {len(locations)} locations to {self.path}.")
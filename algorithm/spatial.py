@@ -0,0 +1,161 @@
+import copy
+import heapq
+import math
+from collections.abc import Hashable, Iterator, Sequence
+from typing import Any
+
+
+class SupplierIndex:
+    """
+    Static KD-tree over supplier coordinates answering nearest-first queries lazily.
+
+    The tree is built once; suppliers are removed and restored in O(log n) by keeping
+    a live count per subtree, so exhausted suppliers are pruned from later queries
+    without rebuilding.
+    """
+
+    def __init__(self, keys: Sequence[Hashable], points: Sequence[Sequence[float]], items: Sequence[Any]):
+        self._items = list(items)
+        self._points = [tuple(point) for point in points]
+        self._positions = {key: i for i, key in enumerate(keys)}
+        self._alive = [True] * len(self._items)
+        self._dims = len(self._points[0]) if self._points else 0
+
+        # Node arrays: the point stored at the node, its children, its parent, the
+        # bounding box of its subtree and the number of live points below it.
+        self._node_point: list[int] = []
+        self._left: list[int] = []
+        self._right: list[int] = []
+        self._parent: list[int] = []
+        self._low: list[tuple[float, ...]] = []
+        self._high: list[tuple[float, ...]] = []
+        self._live: list[int] = []
+        self._node_of = [0] * len(self._items)
+        self._root = self._build(list(range(len(self._items))), 0, -1)
+
+    def _build(self, indices: list[int], depth: int, parent: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % self._dims
+        indices.sort(key=lambda i: self._points[i][axis])
+        mid = len(indices) // 2
+
+        node = len(self._node_point)
+        self._node_point.append(indices[mid])
+        self._left.append(-1)
+        self._right.append(-1)
+        self._parent.append(parent)
+        self._low.append(tuple(min(self._points[i][d] for i in indices) for d in range(self._dims)))
+        self._high.append(tuple(max(self._points[i][d] for i in indices) for d in range(self._dims)))
+        self._live.append(len(indices))
+        self._node_of[indices[mid]] = node
+
+        self._left[node] = self._build(indices[:mid], depth + 1, node)
+        self._right[node] = self._build(indices[mid + 1:], depth + 1, node)
+        return node
+
+    def _box_distance(self, node: int, point: tuple[float, ...]) -> float:
+        total = 0.0
+        for d in range(self._dims):
+            if point[d] < self._low[node][d]:
+                total += (self._low[node][d] - point[d]) ** 2
+            elif point[d] > self._high[node][d]:
+                total += (point[d] - self._high[node][d]) ** 2
+        return math.sqrt(total)
+
+    def _update_live(self, position: int, delta: int):
+        node = self._node_of[position]
+        while node != -1:
+            self._live[node] += delta
+            node = self._parent[node]
+
+    def remove(self, key: Hashable) -> bool:
+        """
+        Exclude a supplier from future queries.
+
+        Args:
+            key (Hashable): Supplier key.
+
+        Returns:
+            bool: True if the supplier was live.
+        """
+        position = self._positions.get(key)
+        if position is None or not self._alive[position]:
+            return False
+        self._alive[position] = False
+        self._update_live(position, -1)
+        return True
+
+    def restore(self, key: Hashable) -> bool:
+        """
+        Make a removed supplier visible to queries again.
+
+        Args:
+            key (Hashable): Supplier key.
+
+        Returns:
+            bool: True if the supplier was removed before.
+        """
+        position = self._positions.get(key)
+        if position is None or self._alive[position]:
+            return False
+        self._alive[position] = True
+        self._update_live(position, 1)
+        return True
+
+    def copy(self) -> "SupplierIndex":
+        """Independent index over the same tree, with its own set of live suppliers."""
+        index = copy.copy(self)
+        index._alive = list(self._alive)
+        index._live = list(self._live)
+        return index
+
+    def live_at(self, position: int) -> bool:
+        """Whether the supplier at a position, in the order the index was built from, is live."""
+        return self._alive[position]
+
+    def __contains__(self, key: Hashable) -> bool:
+        position = self._positions.get(key)
+        return position is not None and self._alive[position]
+
+    def __len__(self) -> int:
+        return self._live[self._root] if self._root != -1 else 0
+
+    def nearest(self, point: Sequence[float]) -> Iterator[tuple[Any, float]]:
+        """
+        Yield live suppliers in increasing distance from a point.
+
+        The search is best-first, so taking the first k suppliers costs O(k log n)
+        and the remaining suppliers are never visited.
+
+        Args:
+            point (Sequence[float]): Query coordinates.
+
+        Yields:
+            tuple[Any, float]: Supplier and its distance from the point.
+        """
+        if self._root == -1:
+            return
+        point = tuple(point)
+        # Heap entries are (distance, tie breaker, is_point, index). Nodes are pushed
+        # with the distance to their bounding box, which never exceeds the distance to
+        # any point below them, so points pop in exact distance order.
+        heap = [(0.0, 0, False, self._root)]
+        counter = 1
+        while heap:
+            distance, _, is_point, index = heapq.heappop(heap)
+            if is_point:
+                if self._alive[index]:
+                    yield self._items[index], distance
+                continue
+            if self._live[index] == 0:
+                continue
+
+            position = self._node_point[index]
+            if self._alive[position]:
+                heapq.heappush(heap, (math.dist(point, self._points[position]), counter, True, position))
+                counter += 1
+            for child in (self._left[index], self._right[index]):
+                if child != -1 and self._live[child] > 0:
+                    heapq.heappush(heap, (self._box_distance(child, point), counter, False, child))
+                    counter += 1
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The engine modules import each other by bare name, as they do when run from algorithm/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulator  # noqa: E402
+from config import get_algorithm_config  # noqa: E402
+from metrics import get_metrics  # noqa: E402
+from records import LocationRecord  # noqa: E402
+
+TEST_API_HOST = "http://simulator.local"
+
+
+@pytest.fixture(autouse=True)
+def algorithm_env(monkeypatch):
+    """Engine settings for tests, with a fresh config and metrics registry per test."""
+    for name, value in {
+        "ALGORITHM_API_HOST": TEST_API_HOST,
+        "ALGORITHM_SEED": "tests",
+        "ALGORITHM_TARGET_DISPATCHES": "50",
+        "ALGORITHM_MAX_ACTIVE_CALLS": "10",
+        "ALGORITHM_RETRY_COUNT": "1",
+        "ALGORITHM_TIMEOUT": "2.0",
+        "ALGORITHM_CIRCUIT_BREAKER_THRESHOLD": "0",
+        "ALGORITHM_EVENT_LOG_PATH": "",
+    }.items():
+        monkeypatch.setenv(name, value)
+    get_algorithm_config.cache_clear()
+    get_metrics.cache_clear()
+    yield
+    get_algorithm_config.cache_clear()
+    get_metrics.cache_clear()
+
+
+@pytest.fixture
+def sim() -> simulator.EmergencySimulator:
+    """Small deterministic map from the bundled simulator."""
+    return simulator.EmergencySimulator(simulator.SimulatorConfig(locations=120, counties=4, seed="tests"))
+
+
+@pytest.fixture
+def api_service(sim):
+    """APIService answered in-process by the simulator."""
+    from api_service import APIService
+
+    service = APIService()
+    simulator.install(service, sim)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def catalog(api_service):
+    """Catalog of every simulator location holding a service, as the engine loads it."""
+    return api_service.get_locations()
+
+
+@pytest.fixture
+def destinations(sim) -> list[LocationRecord]:
+    """Every simulator location, stocked or not, as a record."""
+    return [
+        LocationRecord(location["city"], location["county"], location["latitude"], location["longitude"])
+        for location in sim.locations
+    ]
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from batch_solver import MinCostFlowSolver, min_cost_transport
+from distance import DistanceMatrix
+from inventory import InventoryLedger
+from models import RESOURCE_FIELDS
+from records import EmergencyRecord
+
+
+def brute_force(supplies, demands, edges):
+    """Served units per demand, lexicographically largest in demand order, and the least cost for them."""
+    best = None
+    allocation = [0] * len(edges)
+
+    def visit(i, left, wanted):
+        nonlocal best
+        if i == len(edges):
+            served = tuple(need - rest for need, rest in zip(demands, wanted))
+            cost = sum(units * w for units, (_, _, w) in zip(allocation, edges))
+            if best is None or served > best[0] or (served == best[0] and cost < best[1]):
+                best = (served, cost)
+            return
+        s, d, _ = edges[i]
+        for units in range(min(left[s], wanted[d]) + 1):
+            allocation[i] = units
+            left[s] -= units
+            wanted[d] -= units
+            visit(i + 1, left, wanted)
+            left[s] += units
+            wanted[d] += units
+        allocation[i] = 0
+
+    visit(0, list(supplies), list(demands))
+    return best
+
+
+def summarize(flows, demands, edges):
+    weight = {(s, d): w for s, d, w in edges}
+    served = [0] * len(demands)
+    for (_, d), units in flows.items():
+        served[d] += units
+    return tuple(served), sum(units * weight[key] for key, units in flows.items())
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_min_cost_transport_matches_brute_force(seed, sim, destinations):
+    """Small instances from the simulator map, stock and calls, with the engine's unit costs."""
+    rng = random.Random(seed)
+    resource = rng.choice(RESOURCE_FIELDS)
+    suppliers = rng.sample(destinations, 3)
+    calls = [EmergencyRecord.from_payload(sim._generate_call()) for _ in range(2)]
+    supplies = [sim.stock[loc.key][resource] for loc in suppliers]
+    demands = [max(getattr(call, resource), rng.randint(1, 4)) for call in calls]
+
+    distances = DistanceMatrix(suppliers, destinations)
+    central = rng.choice(destinations)
+    edges = [
+        (s, d, float(cost))
+        for d, call in enumerate(calls)
+        for s, cost in enumerate(distances.costs(central, call))
+        if rng.random() < 0.85
+    ]
+
+    flows = min_cost_transport(supplies, demands, edges)
+    for (s, d), units in flows.items():
+        assert units > 0
+        assert (s, d) in {(es, ed) for es, ed, _ in edges}
+    for s, supply in enumerate(supplies):
+        assert sum(units for (fs, _), units in flows.items() if fs == s) <= supply
+
+    served, cost = summarize(flows, demands, edges)
+    expected_served, expected_cost = brute_force(supplies, demands, edges)
+    assert served == expected_served
+    assert cost == pytest.approx(expected_cost)
+
+
+def test_min_cost_transport_reroutes_earlier_demands():
+    # Demand 0 prefers supplier 0, the only one demand 1 can use; it must move to supplier 1.
+    flows = min_cost_transport([1, 1], [1, 1], [(0, 0, 1.0), (1, 0, 2.0), (0, 1, 1.0)])
+    assert flows == {(1, 0): 1, (0, 1): 1}
+
+
+def test_plan_batch_respects_ledger_stock(api_service, sim, catalog, destinations):
+    inventory = InventoryLedger(api_service)
+    inventory.seed(catalog).join()
+    initial = {loc.key: inventory.availability(loc.city, loc.county) for loc in catalog}
+    suppliers = [loc for loc in catalog if inventory.total(loc.city, loc.county) > 0]
+    solver = MinCostFlowSolver(inventory, DistanceMatrix(suppliers, destinations))
+
+    emergencies = [EmergencyRecord.from_payload(sim._generate_call()) for _ in range(40)]
+    plans = solver.plan_batch(destinations[0], emergencies)
+
+    planned = {}
+    for emergency, (plan, completed) in zip(emergencies, plans):
+        delivered = dict.fromkeys(RESOURCE_FIELDS, 0)
+        for order in plan:
+            assert order.quantity > 0
+            delivered[order.resource] += order.quantity
+            key = (order.source.key, order.resource)
+            planned[key] = planned.get(key, 0) + order.quantity
+        needs = emergency.needs()
+        assert all(delivered[field] <= needs[field] for field in RESOURCE_FIELDS)
+        assert completed == (delivered == needs)
+
+    for (key, resource), units in planned.items():
+        assert units <= initial[key][resource]
+        assert inventory.get(resource, *key) == initial[key][resource] - units
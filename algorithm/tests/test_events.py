@@ -0,0 +1,63 @@
+import pytest
+
+from events import EventLog, _segments, read_events
+
+
+@pytest.fixture
+def calls(sim):
+    """Simulator calls, tagged with the order they were recorded in."""
+    return [{"sequence": i, **sim._generate_call()} for i in range(200)]
+
+
+def record(log, calls):
+    for call in calls:
+        log.record("emergency", **call)
+    log.close()
+
+
+def test_rotates_into_numbered_segments(tmp_path, calls):
+    path = tmp_path / "events.jsonl"
+    record(EventLog(path, max_bytes=1024), calls)
+
+    segments = _segments(path)
+    assert len(segments) >= 10
+    assert [segment.name for segment in segments] == [f"events.jsonl.{i}" for i in range(1, len(segments) + 1)]
+    assert all(segment.stat().st_size >= 1024 for segment in segments)
+    assert path.stat().st_size < 1024
+
+
+def test_read_events_returns_write_order_across_segments(tmp_path, calls):
+    path = tmp_path / "events.jsonl"
+    record(EventLog(path, max_bytes=1024), calls)
+
+    events = list(read_events(path))
+    assert [event["sequence"] for event in events] == list(range(len(calls)))
+    assert all(event["kind"] == "emergency" for event in events)
+    assert events[0]["city"] == calls[0]["city"]
+
+
+def test_reopened_log_continues_numbering(tmp_path, calls):
+    path = tmp_path / "events.jsonl"
+    record(EventLog(path, max_bytes=1024), calls[:100])
+    first_run = len(_segments(path))
+    record(EventLog(path, max_bytes=1024), calls[100:])
+
+    assert len(_segments(path)) > first_run
+    assert [event["sequence"] for event in read_events(path)] == list(range(len(calls)))
+
+
+def test_truncated_last_line_is_skipped(tmp_path, calls):
+    path = tmp_path / "events.jsonl"
+    record(EventLog(path), calls[:5])
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"ts":1,"kind":"emerg')
+
+    assert [event["sequence"] for event in read_events(path)] == list(range(5))
+
+
+def test_disabled_log_writes_nothing(tmp_path, calls):
+    log = EventLog(None)
+    record(log, calls[:5])
+    assert not log.enabled
+    assert list(tmp_path.iterdir()) == []
+    assert list(read_events(tmp_path / "events.jsonl")) == []
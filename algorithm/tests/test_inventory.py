@@ -0,0 +1,118 @@
+import pytest
+
+from api_service import APIService
+from config import get_algorithm_config
+from inventory import InventoryLedger
+
+
+@pytest.fixture
+def ledger(api_service, catalog):
+    inventory = InventoryLedger(api_service)
+    inventory.seed(catalog, workers=4).join()
+    return inventory
+
+
+@pytest.fixture
+def supplier(ledger, catalog):
+    """A supplier holding at least two units of some service, and that service."""
+    for loc in catalog:
+        for service, quantity in ledger.availability(loc.city, loc.county).items():
+            if quantity >= 2:
+                return loc, service
+    pytest.fail("The simulator map has no supplier with two units of a service.")
+
+
+def dispatch(api_service, loc, service, quantity, target):
+    return api_service.dispatch_service_to_city(service, loc.city, loc.county, target.city, target.county, quantity)
+
+
+def test_seed_reads_every_supplier(ledger, sim, catalog):
+    for loc in catalog:
+        assert ledger.availability(loc.city, loc.county) == sim.stock[loc.key]
+    assert ledger.stocked_at_seed() == {loc.key for loc in catalog if any(sim.stock[loc.key].values())}
+    assert ledger.unread_at_seed() == set()
+
+
+def test_seed_notifies_watchers(api_service, catalog):
+    inventory = InventoryLedger(api_service)
+    seen = []
+    inventory.watch(lambda city, county: seen.append((city, county)))
+    inventory.seed(catalog, workers=4).join()
+    assert sorted(seen) == sorted(catalog.keys())
+
+
+def test_reconcile_keeps_unsettled_reservations(ledger, sim, supplier):
+    loc, service = supplier
+    stock = sim.stock[loc.key][service]
+    ledger.debit(service, loc.city, loc.county, 2)
+
+    assert not ledger.reconcile(loc.city, loc.county)
+    assert ledger.get(service, loc.city, loc.county) == stock - 2
+
+
+def test_reconcile_after_confirmed_dispatch(ledger, api_service, sim, supplier, destinations):
+    loc, service = supplier
+    stock = sim.stock[loc.key][service]
+    ledger.debit(service, loc.city, loc.county, 2)
+    assert dispatch(api_service, loc, service, 2, destinations[0])
+    ledger.settle(service, loc.city, loc.county, 2)
+
+    assert not ledger.reconcile(loc.city, loc.county)
+    assert ledger.get(service, loc.city, loc.county) == stock - 2 == sim.stock[loc.key][service]
+
+
+def test_reconcile_after_failed_dispatch_restores_stock(ledger, sim, supplier):
+    loc, service = supplier
+    stock = sim.stock[loc.key][service]
+    seen = []
+    ledger.watch(lambda city, county: seen.append((city, county)))
+    ledger.debit(service, loc.city, loc.county, 2)
+    ledger.settle(service, loc.city, loc.county, 2)
+
+    assert ledger.reconcile(loc.city, loc.county)
+    assert ledger.get(service, loc.city, loc.county) == stock
+    assert loc.key in seen
+
+
+def test_debit_to_zero_notifies_watchers(ledger, supplier):
+    loc, service = supplier
+    seen = []
+    ledger.watch(lambda city, county: seen.append((city, county)))
+    ledger.debit(service, loc.city, loc.county, 1)
+    assert seen == []
+    ledger.debit(service, loc.city, loc.county, ledger.get(service, loc.city, loc.county))
+    assert seen == [loc.key]
+    assert ledger.get(service, loc.city, loc.county) == 0
+
+
+def test_reconcile_all_counts_mismatches(ledger, api_service, sim, catalog, destinations):
+    # Units taken through the API behind the ledger's back show up as mismatches.
+    moved = [loc for loc in catalog if sim.stock[loc.key]["medical"] > 0][:3]
+    for loc in moved:
+        assert dispatch(api_service, loc, "medical", 1, destinations[0])
+
+    assert ledger.reconcile_all() == len(moved)
+    for loc in moved:
+        assert ledger.availability(loc.city, loc.county) == sim.stock[loc.key]
+    assert ledger.reconcile_all() == 0
+
+
+def test_failed_reads_are_tracked_and_never_overwrite(monkeypatch, ledger, catalog, supplier):
+    # Nothing listens on the discard port, so every read fails.
+    monkeypatch.setenv("ALGORITHM_API_HOST", "http://127.0.0.1:9")
+    get_algorithm_config.cache_clear()
+    unreachable = APIService()
+    try:
+        inventory = InventoryLedger(unreachable)
+        keys = catalog.keys()[:3]
+        inventory.seed([catalog.get(*key) for key in keys]).join()
+        assert inventory.unread_at_seed() == set(keys)
+        assert inventory.stocked_at_seed() == set()
+
+        loc, service = supplier
+        ledger.api_service = unreachable
+        before = ledger.availability(loc.city, loc.county)
+        assert not ledger.reconcile(loc.city, loc.county)
+        assert ledger.availability(loc.city, loc.county) == before
+    finally:
+        unreachable.close()
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from ranking import RankedSuppliers
+
+
+@pytest.fixture
+def ranking(catalog):
+    locations = list(catalog)
+    return RankedSuppliers([loc.key for loc in locations], locations), locations
+
+
+def test_iterates_in_rank_order(ranking):
+    ranked, locations = ranking
+    assert list(ranked) == locations
+    assert list(ranked.keys()) == [loc.key for loc in locations]
+    assert len(ranked) == len(locations)
+
+
+def test_matches_brute_force_under_removals_and_restores(ranking):
+    ranked, locations = ranking
+    live = [True] * len(locations)
+    rng = random.Random("ranking")
+    for _ in range(500):
+        i = rng.randrange(len(locations))
+        key = locations[i].key
+        if rng.random() < 0.6:
+            assert ranked.remove(key) == live[i]
+            live[i] = False
+        else:
+            assert ranked.restore(key) == (not live[i])
+            live[i] = True
+
+        expected = [loc for loc, alive in zip(locations, live) if alive]
+        assert list(ranked) == expected
+        assert len(ranked) == len(expected)
+        assert (key in ranked) == live[i]
+        assert ranked.rank(key) == sum(live[:i])
+        if expected:
+            k = rng.randrange(len(expected))
+            assert ranked[k] is expected[k]
+
+
+def test_index_out_of_range(ranking):
+    ranked, locations = ranking
+    with pytest.raises(IndexError):
+        ranked[len(locations)]
+    for loc in locations:
+        ranked.remove(loc.key)
+    assert list(ranked) == []
+    with pytest.raises(IndexError):
+        ranked[0]
+
+
+def test_iteration_sees_removals_ahead_and_skips_restores_behind(ranking):
+    ranked, locations = ranking
+    seen = []
+    for position, loc in enumerate(ranked):
+        seen.append(loc)
+        if position == 0:
+            ranked.remove(locations[2].key)
+        if position == 3:
+            ranked.restore(locations[2].key)
+    assert locations[2] not in seen
+    assert seen == [loc for loc in locations if loc is not locations[2]]
+
+
+def test_copy_is_independent(ranking):
+    ranked, locations = ranking
+    ranked.remove(locations[0].key)
+    copied = ranked.copy()
+    copied.remove(locations[1].key)
+    copied.restore(locations[0].key)
+
+    assert locations[0] not in list(ranked) and locations[1] in list(ranked)
+    assert locations[0] in list(copied) and locations[1] not in list(copied)
+
+
+def test_unknown_keys_are_ignored(ranking):
+    ranked, locations = ranking
+    assert not ranked.remove(("Nowhere", "None"))
+    assert not ranked.restore(("Nowhere", "None"))
+    assert ("Nowhere", "None") not in ranked
+    assert len(ranked) == len(locations)
@@ -0,0 +1,84 @@
+import gzip
+import json
+
+import pytest
+
+from config import get_algorithm_config
+from inventory import InventoryLedger
+from snapshot import SNAPSHOT_VERSION, CatalogSnapshot
+
+
+@pytest.fixture
+def stocked(api_service, catalog):
+    inventory = InventoryLedger(api_service)
+    inventory.seed(catalog, workers=4).join()
+    return inventory.stocked_at_seed()
+
+
+def fields(catalog):
+    return [(loc.city, loc.county, loc.latitude, loc.longitude) for loc in catalog]
+
+
+@pytest.fixture
+def saved(tmp_path, catalog, stocked):
+    snapshot = CatalogSnapshot(tmp_path, get_algorithm_config().api_host, "tests")
+    snapshot.save(catalog, stocked)
+    return snapshot
+
+
+def rewrite(snapshot, change):
+    with gzip.open(snapshot.path, "rt", encoding="utf-8") as file:
+        content = json.load(file)
+    change(content)
+    with gzip.open(snapshot.path, "wt", encoding="utf-8") as file:
+        json.dump(content, file)
+
+
+def test_round_trip(saved, catalog, stocked):
+    loaded = saved.load()
+    assert loaded is not None
+    loaded_catalog, loaded_stocked = loaded
+    assert fields(loaded_catalog) == fields(catalog)
+    assert loaded_stocked == stocked
+    assert not saved.path.with_suffix(".tmp").exists()
+
+
+def test_missing_snapshot(tmp_path):
+    assert CatalogSnapshot(tmp_path, get_algorithm_config().api_host, "tests").load() is None
+
+
+def test_other_host_or_seed_does_not_see_snapshot(tmp_path, saved):
+    assert CatalogSnapshot(tmp_path, "http://elsewhere.local", "tests").load() is None
+    assert CatalogSnapshot(tmp_path, saved.api_host, "other").load() is None
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda content: content.update(version=SNAPSHOT_VERSION + 1),
+        lambda content: content.update(seed="other"),
+        lambda content: content.update(api_host="http://elsewhere.local"),
+        lambda content: content["payload"]["latitude"].__setitem__(0, 0.0),
+        lambda content: content["payload"]["stocked"].append(0),
+        lambda content: content.update(checksum="0" * 64),
+    ],
+    ids=["version", "seed", "host", "payload", "stocked", "checksum"],
+)
+def test_rejects_mismatched_snapshot(saved, change):
+    rewrite(saved, change)
+    assert saved.load() is None
+
+
+def test_rejects_uneven_columns(saved):
+    def drop_city(content):
+        content["payload"]["city"].pop()
+        content["checksum"] = CatalogSnapshot._checksum(content["payload"])
+
+    rewrite(saved, drop_city)
+    assert saved.load() is None
+
+
+@pytest.mark.parametrize("data", [b"not gzip", gzip.compress(b"{truncated")], ids=["gzip", "json"])
+def test_rejects_unreadable_file(saved, data):
+    saved.path.write_bytes(data)
+    assert saved.load() is None
@@ -0,0 +1,76 @@
+import math
+import random
+
+import pytest
+
+from spatial import SupplierIndex
+
+
+@pytest.fixture
+def index(catalog):
+    locations = list(catalog)
+    points = [(loc.latitude, loc.longitude) for loc in locations]
+    return SupplierIndex([loc.key for loc in locations], points, locations), locations
+
+
+def brute_force(locations, live, point):
+    return sorted(
+        (math.dist(point, (loc.latitude, loc.longitude)), loc.key)
+        for loc, alive in zip(locations, live)
+        if alive
+    )
+
+
+def nearest(index, point):
+    return [(distance, loc.key) for loc, distance in index.nearest(point)]
+
+
+def test_nearest_matches_brute_force(index, destinations):
+    tree, locations = index
+    live = [True] * len(locations)
+    for target in destinations[::7]:
+        point = (target.latitude, target.longitude)
+        assert nearest(tree, point) == pytest.approx(brute_force(locations, live, point))
+
+
+def test_nearest_matches_brute_force_under_removals_and_restores(index, destinations):
+    tree, locations = index
+    live = [True] * len(locations)
+    rng = random.Random("spatial")
+    for step in range(300):
+        i = rng.randrange(len(locations))
+        if rng.random() < 0.6:
+            assert tree.remove(locations[i].key) == live[i]
+            live[i] = False
+        else:
+            assert tree.restore(locations[i].key) == (not live[i])
+            live[i] = True
+        assert len(tree) == sum(live)
+        assert tree.live_at(i) == live[i]
+
+        if step % 10 == 0:
+            target = rng.choice(destinations)
+            point = (target.latitude, target.longitude)
+            assert nearest(tree, point) == pytest.approx(brute_force(locations, live, point))
+
+
+def test_nearest_is_lazy(index, destinations):
+    tree, locations = index
+    point = (destinations[0].latitude, destinations[0].longitude)
+    first_three = [loc.key for (loc, _), _ in zip(tree.nearest(point), range(3))]
+    assert first_three == [key for _, key in brute_force(locations, [True] * len(locations), point)[:3]]
+
+
+def test_copy_is_independent(index):
+    tree, locations = index
+    copied = tree.copy()
+    copied.remove(locations[0].key)
+    assert locations[0].key in tree
+    assert locations[0].key not in copied
+    assert len(tree) == len(copied) + 1
+
+
+def test_empty_index_yields_nothing():
+    tree = SupplierIndex([], [], [])
+    assert len(tree) == 0
+    assert list(tree.nearest((45.0, 25.0))) == []
@@ -1,7 +1,20 @@
 import math
 import logging
-from models import Location, LocationBase, EmergencyLocation
+import threading
+from collections.abc import Callable, Iterable, Iterator
+import numpy as np
+from models import RESOURCE_FIELDS
+from records import LocationRecord, EmergencyRecord
 from api_service import APIService
+from catalog import LocationCatalog
+from clustering import EpicenterClusters
+from dispatch import DispatchExecutor, DispatchOrder
+from distance import DistanceMatrix, coordinates, pairwise_distances, project_coordinates
+from inventory import InventoryLedger
+from metrics import get_metrics, phase_timer
+from ordering import SupplierOrder, SupplierOrderCache
+from ranking import RankedSuppliers
+from spatial import SupplierIndex
 
 logger = logging.getLogger(__name__)
 
@@ -9,13 +22,13 @@ class DistanceCalculator:
     """Utility class for distance and cost calculations."""
 
     @staticmethod
-    def calculate_location_distance(loc1: LocationBase, loc2: LocationBase) -> float:
+    def calculate_location_distance(loc1: LocationRecord, loc2: LocationRecord) -> float:
         """
         Calculate Euclidean distance between two locations.
 
         Args:
-            loc1 (LocationBase): First location.
-            loc2 (LocationBase): Second location.
+            loc1 (LocationRecord): First location.
+            loc2 (LocationRecord): Second location.
 
         Returns:
             float: Distance.
@@ -25,36 +38,72 @@ class DistanceCalculator:
         return math.sqrt(lat_diff ** 2 + lon_diff ** 2)
 
     @staticmethod
-    def calculate_cost(central: LocationBase, source: LocationBase, dest: LocationBase) -> float:
+    def calculate_haversine_distance(loc1: LocationRecord, loc2: LocationRecord) -> float:
+        """
+        Calculate great-circle distance between two locations.
+
+        Args:
+            loc1 (LocationRecord): First location.
+            loc2 (LocationRecord): Second location.
+
+        Returns:
+            float: Distance in kilometres.
+        """
+        return float(pairwise_distances(loc1.latitude, loc1.longitude, loc2.latitude, loc2.longitude, "haversine"))
+
+    @staticmethod
+    def calculate_cost(central: LocationRecord, source: LocationRecord, dest: LocationRecord, metric: str = "euclidean") -> float:
         """
         Compute cost based on distance from source to dest relative to central.
 
         Args:
-            central (LocationBase): Central location.
-            source (LocationBase): Source location.
-            dest (LocationBase): Destination location.
+            central (LocationRecord): Central location.
+            source (LocationRecord): Source location.
+            dest (LocationRecord): Destination location.
+            metric (str): "euclidean" or "haversine".
 
         Returns:
             float: Cost.
         """
-        dist_help = DistanceCalculator.calculate_location_distance(source, dest)
-        dist_center = DistanceCalculator.calculate_location_distance(central, source)
+        distance = (
+            DistanceCalculator.calculate_haversine_distance
+            if metric == "haversine"
+            else DistanceCalculator.calculate_location_distance
+        )
+        dist_help = distance(source, dest)
+        dist_center = distance(central, source)
         return dist_help - dist_center
 
 
 class EmergencySolver:
     """Class for solving emergency dispatch logic."""
 
-    def __init__(self, api_service: APIService):
+    def __init__(self, api_service: APIService, inventory: InventoryLedger):
         self.api_service = api_service
-        self.resource_fields = ["medical", "fire", "police", "rescue", "utility"]
-
-    def find_locations_epicenter(self, locations: list[Location], county: str) -> list[float]:
+        self.inventory = inventory
+        self.resource_fields = RESOURCE_FIELDS
+        self.metric = api_service.algorithm_config.distance_metric
+        self.home_county = api_service.algorithm_config.home_county
+        self.distances: DistanceMatrix | None = None
+        self.supplier_index: SupplierIndex | None = None
+        self.supplier_orders: SupplierOrderCache | None = None
+        self.ranking: RankedSuppliers | None = None
+        self.resource_rankings: dict[str, RankedSuppliers] = {}
+        self.resource_indexes: dict[str, SupplierIndex] = {}
+        self.clusters: EpicenterClusters | None = None
+        self.cluster_orders: list[SupplierOrder] = []
+        self.reactivations = 0
+        self.lock = threading.RLock()
+        self.executor = DispatchExecutor(api_service)
+        self.replan_attempts = api_service.algorithm_config.dispatch_replan_attempts
+        self.inventory.watch(self._sync_supplier)
+
+    def find_locations_epicenter(self, locations: LocationCatalog, county: str) -> list[float]:
         """
         Find the average location (epicenter) for a given county.
 
         Args:
-            locations (list[Location]): All available locations.
+            locations (LocationCatalog): All available locations.
             county (str): Target county.
 
         Returns:
@@ -68,107 +117,305 @@ class EmergencySolver:
                 count += 1
         return [lat_sum / count, lon_sum / count] if count > 0 else [0.0, 0.0]
 
-    def rank_locations_by_distance(self, central: LocationBase, locations: list[Location]) -> list[Location]:
+    def rank_locations_by_distance(self, central: LocationRecord, locations: LocationCatalog) -> list[LocationRecord]:
         """
         Rank supply locations based on distance from central.
 
+        Stock is not looked at, so the ranking can be built before the inventory is
+        loaded; index_suppliers only activates suppliers the ledger reports as stocked.
+
         Args:
-            central (LocationBase): Central location.
-            locations (list[Location]): Locations to rank.
+            central (LocationRecord): Central location.
+            locations (LocationCatalog): Locations to rank.
 
         Returns:
-            list[Location]: Sorted by proximity.
+            list[LocationRecord]: Sorted by proximity.
         """
-        distance_list = []
-        for loc in locations:
-            distance = DistanceCalculator.calculate_location_distance(central, loc)
-            total_available = sum(
-                self.api_service.get_service_for_city(resource, loc.city, loc.county)
-                for resource in self.resource_fields
-            )
-            if total_available > 0:
-                logger.debug(f"Location {loc.city} has total available: {total_available}, distance: {distance}")
-                distance_list.append((loc, distance))
+        candidates = list(locations)
+        lat, lon = coordinates(locations)
+        distances = pairwise_distances(central.latitude, central.longitude, lat, lon, self.metric)
+        return [candidates[i] for i in np.argsort(distances, kind="stable")]
+
+    def index_suppliers(self, suppliers: list[LocationRecord], destinations: LocationCatalog):
+        """
+        Build the supplier rankings, distance matrix and spatial indexes used to choose suppliers.
+
+        Besides the indexes over every supplier, each resource gets a ranking and a
+        spatial index holding only the suppliers that have it in stock. Suppliers the
+        ledger has not loaded yet start inactive and are activated when it does.
+        With epicenter clusters configured, every cluster also gets the order of all
+        suppliers by distance to its centroid.
+
+        Args:
+            suppliers (list[LocationRecord]): Ranked supply locations.
+            destinations (LocationCatalog): Locations that may raise emergencies.
+        """
+        keys = [(loc.city, loc.county) for loc in suppliers]
+        self.ranking = RankedSuppliers(keys, suppliers)
+        self.distances = DistanceMatrix(
+            suppliers, destinations, self.metric, self.api_service.algorithm_config.distance_matrix_max_cells
+        )
+        points = project_coordinates(self.distances.supplier_lat, self.distances.supplier_lon, self.metric)
+        self.supplier_index = SupplierIndex(keys, points.tolist(), suppliers)
+        for key in keys:
+            if self.inventory.total(*key) <= 0:
+                self.ranking.remove(key)
+                self.supplier_index.remove(key)
+        for resource in self.resource_fields:
+            ranking = self.ranking.copy()
+            index = self.supplier_index.copy()
+            for key in keys:
+                if self.inventory.get(resource, *key) <= 0:
+                    ranking.remove(key)
+                    index.remove(key)
+            self.resource_rankings[resource] = ranking
+            self.resource_indexes[resource] = index
+
+        config = self.api_service.algorithm_config
+        self.clusters, self.cluster_orders = None, []
+        if config.epicenter_clusters > 0 and len(destinations) > 0:
+            self.clusters = EpicenterClusters(destinations, config.epicenter_clusters, config.seed, self.metric)
+            self.cluster_orders = [
+                SupplierOrder(self.clusters.order_suppliers(cluster, points)) for cluster in range(self.clusters.k)
+            ]
+        self.supplier_orders = (
+            SupplierOrderCache(self.distances, config.supplier_order_cache_size, config.supplier_order_prefix)
+            if config.supplier_order_cache_size > 0 else None
+        )
+
+    def _sync_supplier(self, city: str, county: str):
+        """Bring the indexes of a supplier in line with the ledger after its stock changed."""
+        key = (city, county)
+        with self.lock:
+            for resource in self.resource_fields:
+                if resource not in self.resource_rankings:
+                    continue
+                if self.inventory.get(resource, city, county) > 0:
+                    self.resource_rankings[resource].restore(key)
+                    self.resource_indexes[resource].restore(key)
+                else:
+                    self.resource_rankings[resource].remove(key)
+                    self.resource_indexes[resource].remove(key)
+            if self.inventory.total(city, county) > 0:
+                self.reactivate_supplier(key)
+            else:
+                self.retire_supplier(key)
+
+    def retire_supplier(self, key: tuple[str, str]):
+        """
+        Drop a supplier from the ranking and the spatial index.
 
-        return [loc for loc, _ in sorted(distance_list, key=lambda x: x[1])]
+        Args:
+            key (tuple[str, str]): City and county of the supplier.
+        """
+        with self.lock:
+            if self.ranking is not None:
+                self.ranking.remove(key)
+            if self.supplier_index is not None:
+                self.supplier_index.remove(key)
 
-    def rank_external_suppliers(self, central: LocationBase, city_in_need: Location, locations: list[Location]) -> list[Location]:
+    def reactivate_supplier(self, key: tuple[str, str]):
         """
-        Rank external suppliers based on cost.
+        Put a retired supplier back at its original rank.
 
         Args:
-            central (LocationBase): Central point.
-            city_in_need (Location): Emergency location.
-            locations (list[Location]): Supplier pool.
+            key (tuple[str, str]): City and county of the supplier.
+        """
+        with self.lock:
+            if self.ranking is not None:
+                self.ranking.restore(key)
+            if self.supplier_index is not None and self.supplier_index.restore(key):
+                self.reactivations += 1
 
-        Returns:
-            list[Location]: Ranked by cost.
+    def rank_external_suppliers(self, central: LocationRecord, city_in_need: LocationRecord, resource: str | None = None) -> Iterator[LocationRecord]:
         """
-        cost_list = [
-            (loc, DistanceCalculator.calculate_cost(central, city_in_need, loc))
-            for loc in locations
-        ]
-        return [loc for loc, _ in sorted(cost_list, key=lambda x: x[1])]
+        Rank external suppliers based on cost, lazily.
 
-    def solve_emergency(self, central: LocationBase, emergency_location: EmergencyLocation, supply_locations: list[Location]) -> tuple[list[int], bool]:
+        The cost of a supplier only differs from its distance to the city in need by
+        the central-to-city distance, which is the same for every supplier, so the
+        nearest-first order is the cost order. It is read from the supplier order
+        cache, skipping suppliers without the resource; past the cached prefix, or
+        with the cache disabled, the spatial index is walked instead.
+
+        Args:
+            central (LocationRecord): Central point.
+            city_in_need (LocationRecord): Emergency location.
+            resource (str | None): Only rank suppliers holding this resource.
+
+        Yields:
+            LocationRecord: Suppliers ordered by cost.
+        """
+        index = self.supplier_index if resource is None else self.resource_indexes[resource]
+        covered = None
+        if self.supplier_orders is not None:
+            order = self.supplier_orders.get(city_in_need)
+            yield from self._live_suppliers(order, index)
+            if len(order) == len(self.distances.suppliers):
+                return
+            covered = set(order.order.tolist())
+
+        point = project_coordinates(city_in_need.latitude, city_in_need.longitude, self.metric)[0]
+        for loc, _ in index.nearest(point):
+            if covered is None or self.distances.supplier_positions[(loc.city, loc.county)] not in covered:
+                yield loc
+
+    def _retired_at(self, position: int) -> bool:
+        return not self.supplier_index.live_at(position)
+
+    def _live_suppliers(self, order: SupplierOrder, index: SupplierIndex) -> Iterator[LocationRecord]:
+        """Suppliers of an order that are live in an index, skipping retired ones."""
+        suppliers = self.distances.suppliers
+        for position in order.positions(self._retired_at, self.reactivations):
+            if index.live_at(position):
+                yield suppliers[position]
+
+    def solve_emergency(self, central: LocationRecord, emergency_location: EmergencyRecord) -> bool:
         """
         Solve a given emergency by dispatching resources from the supply pool.
 
+        Planning holds the solver lock so concurrent emergencies never reserve the
+        same units; dispatching happens outside it. Orders the API does not confirm
+        are re-planned up to the configured number of times.
+
         Args:
-            central (LocationBase): Epicenter.
-            emergency_location (EmergencyLocation): Emergency.
-            supply_locations (list[Location]): All supply locations.
+            central (LocationRecord): Epicenter.
+            emergency_location (EmergencyRecord): Emergency.
 
         Returns:
-            tuple[list[int], bool]: Indices of removed locations and completion status.
+            bool: Whether every need was dispatched and confirmed.
         """
-        if emergency_location.county != "Maramureș":
-            supply_locations = self.rank_external_suppliers(central, emergency_location, supply_locations)
+        with self.lock:
+            plan, completed = self.plan_emergency(central, emergency_location)
+
+        unmet = self.dispatch_plan(central, emergency_location, plan)
+        return completed and not any(unmet.values())
 
-        return self._fulfill_emergency_needs(emergency_location, supply_locations)
+    def dispatch_plan(
+        self, central: LocationRecord, emergency_location: EmergencyRecord, plan: list[DispatchOrder]
+    ) -> dict[str, int]:
+        """
+        Execute a reserved plan, re-planning orders the API does not confirm.
 
-    def _fulfill_emergency_needs(self, emergency: EmergencyLocation, suppliers: list[Location]) -> tuple[list[int], bool]:
+        Args:
+            central (LocationRecord): Epicenter.
+            emergency_location (EmergencyRecord): Emergency.
+            plan (list[DispatchOrder]): Reserved dispatches.
+
+        Returns:
+            dict[str, int]: Quantity per service still needed once every confirmed order is counted.
+        """
+        unmet = emergency_location.needs()
+
+        def count_confirmed(plan: list[DispatchOrder], failed: list[DispatchOrder]):
+            unconfirmed = {id(order) for order in failed}
+            for order in plan:
+                if id(order) not in unconfirmed:
+                    unmet[order.resource] = max(unmet[order.resource] - order.quantity, 0)
+
+        failed = self.execute_plan(emergency_location, plan)
+        count_confirmed(plan, failed)
+        for _ in range(self.replan_attempts):
+            if not failed:
+                break
+            shortfall = {field: 0 for field in self.resource_fields}
+            for order in failed:
+                shortfall[order.resource] += order.quantity
+            logger.info(f"Re-planning {shortfall} for {emergency_location.city} after failed dispatches.")
+            with self.lock:
+                plan, _ = self.plan_emergency(
+                    central, emergency_location.replace(**shortfall)
+                )
+            failed = self.execute_plan(emergency_location, plan)
+            count_confirmed(plan, failed)
+
+        return unmet
+
+    def plan_emergency(
+        self, central: LocationRecord, emergency_location: EmergencyRecord
+    ) -> tuple[list[DispatchOrder], bool]:
+        """
+        Choose the dispatches for an emergency and reserve them in the inventory ledger.
+
+        Each needed resource is filled on its own from the suppliers holding it. With
+        epicenter clusters, suppliers come in the precomputed order of the emergency's
+        cluster. Otherwise they come in epicenter rank order for the home county and
+        in cost order elsewhere.
+
+        Args:
+            central (LocationRecord): Epicenter.
+            emergency_location (EmergencyRecord): Emergency.
+
+        Returns:
+            tuple[list[DispatchOrder], bool]: Planned dispatches and whether they cover every need.
+        """
+        with phase_timer("availability"):
+            if self.clusters is not None:
+                order = self.cluster_orders[self.clusters.cluster_of(emergency_location)]
+
+                def suppliers_for(resource: str) -> Iterable[LocationRecord]:
+                    return self._live_suppliers(order, self.resource_indexes[resource])
+            elif emergency_location.county != self.home_county:
+                def suppliers_for(resource: str) -> Iterable[LocationRecord]:
+                    return self.rank_external_suppliers(central, emergency_location, resource)
+            else:
+                suppliers_for = self.resource_rankings.__getitem__
+
+            return self._fulfill_emergency_needs(emergency_location, suppliers_for)
+
+    def execute_plan(self, emergency: EmergencyRecord, plan: list[DispatchOrder]) -> list[DispatchOrder]:
+        """
+        Send the planned dispatches to the API.
+
+        Every order settles its reservation in the inventory ledger. Suppliers of
+        failed orders are then reconciled, since the API is the only
+        reliable source for what they hold after an unconfirmed dispatch. The
+        ledger notifies the solver, which reactivates them if they still hold stock.
+
+        Args:
+            emergency (EmergencyRecord): Emergency.
+            plan (list[DispatchOrder]): Dispatches reserved by plan_emergency.
+
+        Returns:
+            list[DispatchOrder]: Orders the API did not confirm.
+        """
+        with phase_timer("dispatch"):
+            failed = self.executor.execute(emergency, plan)
+        for order in plan:
+            self.inventory.settle(order.resource, order.source.city, order.source.county, order.quantity)
+        for city, county in {(order.source.city, order.source.county) for order in failed}:
+            self.inventory.reconcile(city, county)
+        return failed
+
+    def _fulfill_emergency_needs(
+        self, emergency: EmergencyRecord, suppliers_for: Callable[[str], Iterable[LocationRecord]]
+    ) -> tuple[list[DispatchOrder], bool]:
         needed = {
             field: getattr(emergency, field)
             for field in self.resource_fields
             if getattr(emergency, field, 0) > 0
         }
-        indices_to_remove = []
+        plan = []
+        visited = 0
         logger.info(f"EMERGENCY at {emergency.city}: needs {needed}")
 
-        for i, supplier in enumerate(suppliers):
-            availability = {
-                field: self.api_service.get_service_for_city(field, supplier.city, supplier.county)
-                for field in self.resource_fields
-            }
-
-            if all(qty == 0 for qty in availability.values()):
-                logger.info(f"Skipping {supplier.city}: no available resources.")
-                indices_to_remove.append(i)
-                continue
-
-            for resource, amount_needed in needed.items():
-                available = availability.get(resource, 0)
-                if amount_needed <= 0 or available <= 0:
+        for resource, amount_needed in needed.items():
+            for supplier in suppliers_for(resource):
+                visited += 1
+                available = self.inventory.get(resource, supplier.city, supplier.county)
+                if available <= 0:
                     continue
 
                 to_dispatch = min(available, amount_needed)
-                logger.info(f"Dispatching {to_dispatch} {resource} from {supplier.city} to {emergency.city}")
-                self.api_service.dispatch_service_to_city(
-                    resource,
-                    supplier.city,
-                    supplier.county,
-                    emergency.city,
-                    emergency.county,
-                    to_dispatch,
-                )
-                needed[resource] -= to_dispatch
-
-            if all(v <= 0 for v in needed.values()):
-                return indices_to_remove, True
-
+                self.inventory.debit(resource, supplier.city, supplier.county, to_dispatch)
+                plan.append(DispatchOrder(resource, supplier, to_dispatch))
+                amount_needed -= to_dispatch
+                if amount_needed <= 0:
+                    break
+            needed[resource] = amount_needed
+
+        get_metrics().counter("solver_suppliers_visited_total", "Suppliers visited while planning.").inc(visited)
         if any(v > 0 for v in needed.values()):
             logger.warning(f"Emergency at {emergency.city} could not be fully resolved. Remaining needs: {needed}")
-            return indices_to_remove, False
+            return plan, False
 
-        return indices_to_remove, True
+        return plan, True